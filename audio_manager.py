@@ -4,22 +4,77 @@ Audio manager for playing sound effects using I2S audio output
 
 import os
 import random
+import time
 import wave
 import numpy as np
 import alsaaudio
 import threading
-import queue
 from config import *
 
+class SpscRing:
+    """Single-producer single-consumer ring buffer for queued sounds
+
+    The main thread enqueues, the playback worker dequeues. CPython makes
+    int and list-slot stores atomic under the GIL, so with exactly one
+    producer and one consumer neither side needs a lock - unlike
+    queue.Queue, which takes a lock and condition on every put/get.
+    """
+
+    def __init__(self, capacity=64):
+        # Power-of-two capacity so indexing is a mask, not a modulo
+        cap = 1
+        while cap < capacity:
+            cap <<= 1
+        self._buf = [None] * cap
+        self._mask = cap - 1
+        self._head = 0  # Consumer index
+        self._tail = 0  # Producer index
+
+    def put(self, item):
+        """Producer side; returns False when the ring is full"""
+        if self._tail - self._head > self._mask:
+            return False
+        self._buf[self._tail & self._mask] = item
+        self._tail += 1
+        return True
+
+    def get(self):
+        """Consumer side; returns None when empty"""
+        if self._head == self._tail:
+            return None
+        slot = self._head & self._mask
+        item = self._buf[slot]
+        self._buf[slot] = None
+        self._head += 1
+        return item
+
+    def pending(self):
+        """Snapshot of currently queued items (producer-side helper)
+
+        Entries may be consumed while iterating; good enough for
+        best-effort coalescing checks, not for exact accounting.
+        """
+        head, tail = self._head, self._tail
+        return [self._buf[i & self._mask] for i in range(head, tail)]
+
+    def __len__(self):
+        return self._tail - self._head
+
+
 class AudioManager:
     """Manages audio playback for sound effects"""
     
     def __init__(self):
-        self.audio_queue = queue.Queue()
+        # Small bound keeps trigger-to-sound latency tight: a detection
+        # flurry drops extra sounds instead of queueing a backlog that
+        # plays long after the moment has passed
+        self.audio_queue = SpscRing(capacity=4)
         self.is_playing = False
         self.current_volume = AUDIO_VOLUME
+        self._vol_q15 = int(max(0.0, min(1.0, AUDIO_VOLUME)) * 32768)
         self.playback_thread = None
         self.stop_playback = False
+        self.period_size = 1024
         
         # Initialize ALSA audio output
         try:
@@ -28,39 +83,92 @@ class AudioManager:
                 mode=alsaaudio.PCM_NORMAL,
                 device='default'
             )
-            
+
             # Set audio parameters
             self.device.setchannels(AUDIO_CHANNELS)
             self.device.setrate(AUDIO_SAMPLE_RATE)
             self.device.setformat(alsaaudio.PCM_FORMAT_S16_LE)
-            self.device.setperiodsize(1024)
-            
+            self.period_size = self._configure_period_size()
+
             print("Audio manager initialized successfully")
         except alsaaudio.ALSAAudioError as e:
             print(f"Error initializing audio: {e}")
             self.device = None
-        
-        # Verify sound files exist
+
+        # Pre-allocated scratch buffers for volume scaling, one period each
+        # Scaling happens in the int16/int32 domain to avoid the
+        # int16 -> float64 -> int16 round trip and per-chunk allocations
+        self._scratch_i32 = np.empty(self.period_size * AUDIO_CHANNELS, dtype=np.int32)
+        self._scratch_i16 = np.empty(self.period_size * AUDIO_CHANNELS, dtype=np.int16)
+
+        # Verify sound files exist. available_sounds maps
+        # category -> {filename: fullpath} so specific-file lookups are a
+        # hash probe; the flat lists back the random-choice path
         self.available_sounds = self._scan_sound_files()
+        self._category_files = {
+            category: list(paths.values())
+            for category, paths in self.available_sounds.items()
+        }
         
         # Start playback thread
         self._start_playback_thread()
     
+    def _configure_period_size(self):
+        """Configure the ALSA period/buffer pair instead of a blind 1024
+
+        Targets roughly half of a 100 ms buffer (~46 ms at 22050 Hz) so the
+        driver ends up with 2-3 periods per buffer rather than whatever
+        dmix/PipeWire would pick for a bare setperiodsize(1024). Falls back
+        to progressively smaller periods if the device rejects the target.
+        """
+        target = AUDIO_SAMPLE_RATE // 20  # ~50 ms of frames
+        # Round down to a power of two so period divides the buffer cleanly
+        period = 1 << (target.bit_length() - 1)
+
+        while period >= 128:
+            try:
+                actual = self.device.setperiodsize(period)
+                # Some backends adjust the request; trust what came back
+                if actual:
+                    period = actual
+                break
+            except alsaaudio.ALSAAudioError:
+                period //= 2
+
+        # Size the ring buffer at ~3 periods where the API allows it
+        if hasattr(self.device, 'setbuffersize'):
+            try:
+                self.device.setbuffersize(period * 3)
+            except alsaaudio.ALSAAudioError:
+                pass
+
+        if DEBUG_MODE:
+            print(f"ALSA period size: {period} frames")
+
+        return period
+
     def _scan_sound_files(self):
         """Scan and catalog available sound files"""
         sounds = {}
-        
+
+        # One scandir pass instead of a stat() per configured file
+        try:
+            present = {e.name: e.path for e in os.scandir(AUDIO_BASE_PATH) if e.is_file()}
+        except OSError as e:
+            print(f"Warning: Cannot read sound directory {AUDIO_BASE_PATH}: {e}")
+            present = {}
+
         for category, files in SOUND_EFFECTS.items():
-            sounds[category] = []
+            sounds[category] = {}
             for filename in files:
-                filepath = os.path.join(AUDIO_BASE_PATH, filename)
-                if os.path.exists(filepath):
-                    sounds[category].append(filepath)
+                filepath = present.get(filename)
+                if filepath is not None:
+                    sounds[category][filename] = filepath
                     if DEBUG_MODE:
                         print(f"Found sound: {category}/{filename}")
                 else:
-                    print(f"Warning: Sound file not found: {filepath}")
-        
+                    print(f"Warning: Sound file not found: {os.path.join(AUDIO_BASE_PATH, filename)}")
+
         return sounds
     
     def _start_playback_thread(self):
@@ -72,19 +180,26 @@ class AudioManager:
         """Background worker that processes audio queue"""
         while not self.stop_playback:
             try:
-                # Get next audio file from queue (with timeout)
-                audio_file = self.audio_queue.get(timeout=0.1)
-                
-                if audio_file and self.device:
+                # Get next queued sound from the ring (non-blocking)
+                entry = self.audio_queue.get()
+
+                if entry is None:
+                    time.sleep(0.05)
+                    continue
+
+                if self.device:
+                    _category, audio_file = entry
                     self._play_wav_file(audio_file)
-                
-                self.audio_queue.task_done()
-                
-            except queue.Empty:
-                continue
+
             except Exception as e:
                 print(f"Error in playback worker: {e}")
-    
+
+        # Drain on the way out. The worker is the ring's only consumer,
+        # so the drain has to happen here: running get() from stop_all
+        # would race this thread's head-index updates
+        while self.audio_queue.get() is not None:
+            pass
+
     def _play_wav_file(self, filepath):
         """Play a WAV file"""
         if not self.device:
@@ -97,23 +212,52 @@ class AudioManager:
                 # Verify format
                 if wf.getnchannels() != AUDIO_CHANNELS:
                     print(f"Warning: Audio file has {wf.getnchannels()} channels, expected {AUDIO_CHANNELS}")
-                
+
                 if wf.getframerate() != AUDIO_SAMPLE_RATE:
                     print(f"Warning: Audio file sample rate is {wf.getframerate()}Hz, expected {AUDIO_SAMPLE_RATE}Hz")
-                
-                # Read and play audio data
-                data = wf.readframes(1024)
-                
-                while data and not self.stop_playback:
-                    # Apply volume
-                    if self.current_volume != 1.0:
+
+                # Read the PCM data once (sound effects are short), then
+                # stream zero-copy slices per period instead of allocating
+                # a fresh bytes object every period
+                pcm = memoryview(wf.readframes(wf.getnframes()))
+                chunk_bytes = self.period_size * wf.getnchannels() * wf.getsampwidth()
+
+                # Hoist the volume decision out of the loop: at full
+                # volume every chunk goes to ALSA as a zero-copy slice
+                # with no numpy work at all, and a mid-file set_volume
+                # doesn't flip paths between chunks
+                vol_q15 = self._vol_q15
+                do_scale = vol_q15 != 32768
+
+                # The scratch buffers are sized for AUDIO_CHANNELS; a
+                # file with more channels (warned about above but still
+                # played) needs bigger ones. Grow once per file so the
+                # per-chunk path stays allocation-free
+                if do_scale and chunk_bytes // 2 > len(self._scratch_i32):
+                    samples = chunk_bytes // 2
+                    self._scratch_i32 = np.empty(samples, dtype=np.int32)
+                    self._scratch_i16 = np.empty(samples, dtype=np.int16)
+
+                for start in range(0, len(pcm), chunk_bytes):
+                    if self.stop_playback:
+                        break
+
+                    data = pcm[start:start + chunk_bytes]
+
+                    # Apply volume (Q15 fixed-point, stays in integer domain)
+                    if do_scale:
                         audio_array = np.frombuffer(data, dtype=np.int16)
-                        audio_array = (audio_array * self.current_volume).astype(np.int16)
-                        data = audio_array.tobytes()
-                    
+                        n = len(audio_array)
+                        scratch = self._scratch_i32[:n]
+                        np.multiply(audio_array, vol_q15, dtype=np.int32,
+                                    out=scratch)
+                        np.right_shift(scratch, 15, out=scratch)
+                        out = self._scratch_i16[:n]
+                        np.copyto(out, scratch, casting='unsafe')
+                        data = memoryview(out)
+
                     # Write to audio device
                     self.device.write(data)
-                    data = wf.readframes(1024)
             
             if DEBUG_MODE:
                 print(f"Finished playing: {os.path.basename(filepath)}")
@@ -123,38 +267,48 @@ class AudioManager:
         finally:
             self.is_playing = False
     
-    def play_sound(self, category, specific_file=None):
+    def play_sound(self, category, specific_file=None, coalesce=True):
         """
         Play a sound effect from the specified category
-        
+
         Args:
             category: Sound category ('ambient', 'detection', 'scare')
             specific_file: Optional specific filename to play, otherwise random
+            coalesce: Skip the sound if one from the same category is
+                already waiting, so repeated triggers don't stack up
         """
         if category not in self.available_sounds:
             print(f"Unknown sound category: {category}")
             return
-        
+
         available_files = self.available_sounds[category]
-        
+
         if not available_files:
             print(f"No sounds available in category: {category}")
             return
-        
+
         if specific_file:
-            # Play specific file if it exists
-            filepath = os.path.join(AUDIO_BASE_PATH, specific_file)
-            if filepath in available_files:
-                self.audio_queue.put(filepath)
-            else:
+            # Play specific file if it exists (O(1) dict lookup, no join)
+            filepath = available_files.get(specific_file)
+            if filepath is None:
                 print(f"Specific file not found: {specific_file}")
+                return
         else:
             # Play random file from category
-            filepath = random.choice(available_files)
-            self.audio_queue.put(filepath)
-            
+            filepath = random.choice(self._category_files[category])
+
+        if coalesce:
+            for entry in self.audio_queue.pending():
+                if entry is not None and entry[0] == category:
+                    if DEBUG_MODE:
+                        print(f"Coalesced {category} sound (one already queued)")
+                    return
+
+        if self.audio_queue.put((category, filepath)):
             if DEBUG_MODE:
                 print(f"Queued sound: {category}/{os.path.basename(filepath)}")
+        elif DEBUG_MODE:
+            print(f"Audio queue full, dropped {category} sound")
     
     def play_random_ambient(self):
         """Play a random ambient sound"""
@@ -176,18 +330,15 @@ class AudioManager:
             volume: Float between 0.0 (silent) and 1.0 (full volume)
         """
         self.current_volume = max(0.0, min(1.0, volume))
+        self._vol_q15 = int(self.current_volume * 32768)
         if DEBUG_MODE:
             print(f"Volume set to: {self.current_volume * 100:.0f}%")
     
     def stop_all(self):
         """Stop all audio playback"""
-        # Clear queue
-        while not self.audio_queue.empty():
-            try:
-                self.audio_queue.get_nowait()
-            except queue.Empty:
-                break
-        
+        # Flag the worker down; it drains the ring itself on exit.
+        # get() must never run on this (producer) thread - SpscRing's
+        # lock-free design only holds with a single consumer
         self.stop_playback = True
         self.is_playing = False
     
@@ -197,7 +348,7 @@ class AudioManager:
     
     def get_queue_size(self):
         """Get number of sounds waiting to play"""
-        return self.audio_queue.qsize()
+        return len(self.audio_queue)
     
     def cleanup(self):
         """Cleanup audio resources"""
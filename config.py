@@ -11,6 +11,11 @@ SPI_SPEED_HZ = 50000000  # 50 MHz
 SPI_BUS = 0
 SPI_DEVICE = 0
 
+# CS pins wired to hardware chip-enable lines (BCM pin -> CE index).
+# Displays on these pins get kernel-driven chip select; anything else
+# falls back to GPIO bit-banged CS
+SPI_CE_PINS = {8: 0, 7: 1}
+
 # Display Pin Assignments (CS, DC, RST)
 DISPLAY_PINS = {
     'left': {'cs': 8, 'dc': 24, 'rst': 25},
@@ -24,6 +29,17 @@ CAMERA_HEIGHT = 480
 CAMERA_FPS = 30
 FACE_DETECTION_SCALE = 1.1
 FACE_MIN_NEIGHBORS = 5
+FACE_DETECT_DOWNSCALE = 2  # Detect on a 1/2-size frame, scale rects back up
+FACE_MIN_SIZE = 30  # Minimum face size in full-resolution pixels
+# YuNet ONNX model, relative to the project directory. When the file is
+# present (and OpenCV >= 4.5.4) it replaces the cascade detector
+FACE_MODEL_PATH = 'face_detection_yunet_2023mar.onnx'
+# OpenCV worker-thread pool size. Three of the Pi 4's four cores keeps
+# detection parallel while leaving headroom for the capture thread
+OPENCV_NUM_THREADS = 3
+# Run a near-range and a far-range cascade pass concurrently (uses two
+# extra cores; only worth enabling on hosts with headroom)
+FACE_DUAL_SCALE_DETECT = False
 
 # Eye Behavior Configuration
 EYE_MODES = {
@@ -5,9 +5,13 @@ Display manager for controlling three round GC9A01A displays
 import spidev
 import RPi.GPIO as GPIO
 import time
+import struct
 import numpy as np
 from config import *
 
+# Prebuilt packer for window coordinates (two big-endian uint16s)
+_U16x2 = struct.Struct('>HH')
+
 class GC9A01A:
     """Driver for GC9A01A round display"""
     
@@ -20,24 +24,41 @@ class GC9A01A:
     CMD_MADCTL = 0x36  # Memory data access control
     CMD_COLMOD = 0x3A  # Interface pixel format
     
-    def __init__(self, spi, cs_pin, dc_pin, rst_pin, width=240, height=240):
+    def __init__(self, spi, cs_pin, dc_pin, rst_pin, width=240, height=240,
+                 fill_cache=None, hw_cs=False, auto_init=True):
         self.spi = spi
         self.cs_pin = cs_pin
         self.dc_pin = dc_pin
         self.rst_pin = rst_pin
         self.width = width
         self.height = height
-        
+
+        # With a hardware CE line the kernel asserts chip select per
+        # transfer and the GPIO toggles below are skipped entirely
+        self.hw_cs = hw_cs
+
+        # Prebuilt full-screen fill buffers, one per color ever used.
+        # DisplayManager passes a shared dict so all three displays reuse
+        # the same bytes objects instead of caching per display
+        self._fill_cache = fill_cache if fill_cache is not None else {}
+
+        # Reusable 4-byte scratch for window coordinates
+        self._win_buf = bytearray(4)
+
         # Setup GPIO
         GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.cs_pin, GPIO.OUT)
         GPIO.setup(self.dc_pin, GPIO.OUT)
         GPIO.setup(self.rst_pin, GPIO.OUT)
-        
-        # Initialize display
-        self.reset()
-        self.init_display()
-    
+        if not self.hw_cs:
+            GPIO.setup(self.cs_pin, GPIO.OUT)
+
+        # Initialize display. DisplayManager passes auto_init=False and
+        # batch-resets all displays so the reset sleeps run once, not per
+        # display
+        if auto_init:
+            self.reset()
+            self.init_display()
+
     def reset(self):
         """Hardware reset"""
         GPIO.output(self.rst_pin, GPIO.HIGH)
@@ -50,33 +71,48 @@ class GC9A01A:
     def write_cmd(self, cmd):
         """Write command byte"""
         GPIO.output(self.dc_pin, GPIO.LOW)
-        GPIO.output(self.cs_pin, GPIO.LOW)
-        self.spi.writebytes([cmd])
-        GPIO.output(self.cs_pin, GPIO.HIGH)
-    
+        if self.hw_cs:
+            self.spi.writebytes([cmd])
+        else:
+            GPIO.output(self.cs_pin, GPIO.LOW)
+            self.spi.writebytes([cmd])
+            GPIO.output(self.cs_pin, GPIO.HIGH)
+
     def write_data(self, data):
-        """Write data bytes"""
+        """Write data bytes (int, list of ints, or bytes-like)"""
         GPIO.output(self.dc_pin, GPIO.HIGH)
-        GPIO.output(self.cs_pin, GPIO.LOW)
         if isinstance(data, int):
-            self.spi.writebytes([data])
+            data = [data]
+        # Bytes-like payloads skip the per-element int conversion
+        write = self.spi.writebytes2 if isinstance(data, (bytes, bytearray, memoryview)) \
+            else self.spi.writebytes
+        if self.hw_cs:
+            write(data)
         else:
-            self.spi.writebytes(data)
-        GPIO.output(self.cs_pin, GPIO.HIGH)
+            GPIO.output(self.cs_pin, GPIO.LOW)
+            write(data)
+            GPIO.output(self.cs_pin, GPIO.HIGH)
     
     def init_display(self):
         """Initialize display with proper settings"""
         self.write_cmd(self.CMD_SLPOUT)
         time.sleep(0.12)
-        
+        self.apply_init_settings()
+
+    def apply_init_settings(self):
+        """Configure pixel format/rotation and turn the display on
+
+        Split from init_display so DisplayManager can issue the sleep-out
+        wait once for all displays before configuring each.
+        """
         # Set color mode to 16-bit (RGB565)
         self.write_cmd(self.CMD_COLMOD)
         self.write_data(0x55)
-        
+
         # Set rotation
         self.write_cmd(self.CMD_MADCTL)
         self.write_data(0x00)  # Adjust based on rotation needed
-        
+
         # Display on
         self.write_cmd(self.CMD_DISPON)
         time.sleep(0.01)
@@ -84,11 +120,13 @@ class GC9A01A:
     def set_window(self, x0, y0, x1, y1):
         """Set drawing window"""
         self.write_cmd(self.CMD_CASET)
-        self.write_data([x0 >> 8, x0 & 0xFF, x1 >> 8, x1 & 0xFF])
-        
+        _U16x2.pack_into(self._win_buf, 0, x0, x1)
+        self.write_data(self._win_buf)
+
         self.write_cmd(self.CMD_RASET)
-        self.write_data([y0 >> 8, y0 & 0xFF, y1 >> 8, y1 & 0xFF])
-        
+        _U16x2.pack_into(self._win_buf, 0, y0, y1)
+        self.write_data(self._win_buf)
+
         self.write_cmd(self.CMD_RAMWR)
     
     def draw_pixel(self, x, y, color):
@@ -100,48 +138,114 @@ class GC9A01A:
     def fill_screen(self, color):
         """Fill entire screen with color"""
         self.set_window(0, 0, self.width - 1, self.height - 1)
-        
-        # Prepare color data
-        color_bytes = [(color >> 8) & 0xFF, color & 0xFF]
-        data = color_bytes * (self.width * self.height)
-        
-        # Write in chunks to avoid memory issues
-        chunk_size = 4096
-        for i in range(0, len(data), chunk_size):
-            chunk = data[i:i + chunk_size]
-            self.write_data(chunk)
-    
+
+        # Stream one prebuilt RGB565 buffer instead of a Python list of
+        # ints; writebytes2 takes bytes-like objects and chunks internally
+        buf = self._fill_cache.get(color)
+        if buf is None:
+            buf = struct.pack('>H', color) * (self.width * self.height)
+            self._fill_cache[color] = buf
+
+        self._write_pixels(buf)
+
     def draw_buffer(self, buffer):
-        """Draw a full screen buffer (240x240 RGB565 data)"""
+        """Draw a full screen buffer (240x240 big-endian RGB565, bytes-like)"""
         self.set_window(0, 0, self.width - 1, self.height - 1)
-        self.write_data(buffer)
+        self._write_pixels(buffer)
+
+    def _write_pixels(self, buf):
+        """Stream a bytes-like pixel buffer after a set_window"""
+        GPIO.output(self.dc_pin, GPIO.HIGH)
+        if self.hw_cs:
+            self.spi.writebytes2(buf)
+        else:
+            GPIO.output(self.cs_pin, GPIO.LOW)
+            self.spi.writebytes2(buf)
+            GPIO.output(self.cs_pin, GPIO.HIGH)
 
 
 class DisplayManager:
     """Manages all three displays"""
     
     def __init__(self):
-        # Initialize SPI
-        self.spi = spidev.SpiDev()
-        self.spi.open(SPI_BUS, SPI_DEVICE)
-        self.spi.max_speed_hz = SPI_SPEED_HZ
-        self.spi.mode = 0
-        
-        # Initialize displays
+        # Shared fill-buffer cache, pre-warmed with the colors every eye
+        # fills each frame so no display ever builds its own copy
+        pixels = DISPLAY_SIZE * DISPLAY_SIZE
+        self._fill_bufs = {
+            color: struct.pack('>H', color) * pixels
+            for color in (SCLERA_COLOR, BACK_COLOR, EYELID_COLOR)
+        }
+
+        # Initialize displays. Each gets its own SpiDev handle. The
+        # kernel stores SPI mode flags (including no_cs) on the shared
+        # spi_device, not per file descriptor, so a CE line whose
+        # devnode is also opened by a software-CS user - the fallback
+        # display and the LED strip both run no_cs on SPI_DEVICE -
+        # cannot reliably assert hardware chip select: whichever handle
+        # sets the flag last wins for everyone on that devnode. Only CE
+        # lines with a devnode of their own keep hardware CS; the rest
+        # use GPIO bit-banged CS like the baseline
         self.displays = {}
+        self._spi_handles = []
         for name, pins in DISPLAY_PINS.items():
+            spi = spidev.SpiDev()
+            ce = SPI_CE_PINS.get(pins['cs'])
+            hw_cs = ce is not None and ce != SPI_DEVICE
+            spi.open(SPI_BUS, ce if hw_cs else SPI_DEVICE)
+            spi.max_speed_hz = SPI_SPEED_HZ
+            spi.mode = 0
+            if not hw_cs:
+                try:
+                    spi.no_cs = True
+                except (IOError, OSError):
+                    print(f"Warning: could not disable hardware CS for {name} display")
+            self._spi_handles.append(spi)
+
             self.displays[name] = GC9A01A(
-                self.spi,
+                spi,
                 pins['cs'],
                 pins['dc'],
                 pins['rst'],
                 DISPLAY_SIZE,
-                DISPLAY_SIZE
+                DISPLAY_SIZE,
+                fill_cache=self._fill_bufs,
+                hw_cs=hw_cs,
+                auto_init=False
             )
+
+        # Reset and initialize all displays in lockstep so the mandatory
+        # controller wait times are paid once instead of per display
+        self._init_all_displays()
         
         print("Display manager initialized")
         self.clear_all()
     
+    def _init_all_displays(self):
+        """Hardware-reset and initialize every display in parallel
+
+        RST lines toggle together and the sleep-out wait happens once,
+        cutting init from ~3x the per-display wait to ~1x. SPI chip
+        select isolates the per-display configuration commands.
+        """
+        displays = list(self.displays.values())
+        rst_pins = [d.rst_pin for d in displays]
+
+        GPIO.output(rst_pins, GPIO.HIGH)
+        time.sleep(0.01)
+        GPIO.output(rst_pins, GPIO.LOW)
+        time.sleep(0.01)
+        GPIO.output(rst_pins, GPIO.HIGH)
+        time.sleep(0.12)
+
+        # Wake all controllers, wait out the sleep-out time once, then
+        # configure each
+        for display in displays:
+            display.write_cmd(display.CMD_SLPOUT)
+        time.sleep(0.12)
+
+        for display in displays:
+            display.apply_init_settings()
+
     def clear_all(self):
         """Clear all displays to black"""
         for display in self.displays.values():
@@ -161,8 +265,23 @@ class DisplayManager:
     def get_display(self, name):
         """Get a specific display by name"""
         return self.displays.get(name)
+
+    def draw_all(self, buffers):
+        """Stream full-frame buffers to several displays back-to-back
+
+        buffers maps display name -> bytes-like RGB565 frame. Windows are
+        set per display and the pixel data is pushed in one tight
+        sequence; buffer-protocol objects (numpy arrays, memoryviews) go
+        straight to spidev without an intermediate bytes copy.
+        """
+        for name, buf in buffers.items():
+            display = self.displays[name]
+            display.set_window(0, 0, display.width - 1, display.height - 1)
+            display._write_pixels(buf)
     
     def cleanup(self):
-        """Cleanup GPIO"""
+        """Cleanup GPIO and SPI handles"""
         self.clear_all()
+        for spi in self._spi_handles:
+            spi.close()
         GPIO.cleanup()
\ No newline at end of file
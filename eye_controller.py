@@ -5,178 +5,240 @@ Eye animation controller based on Adafruit M4_Eyes logic
 import time
 import random
 import math
+import numpy as np
 from config import *
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernel still runs without numba"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
 class EyeState:
     """Blink states"""
     NOBLINK = 0
     ENBLINK = 1  # Eye closing
     DEBLINK = 2  # Eye opening
 
+
+@njit(cache=True)
+def _advance_eyes(eye_xy, old_xy, new_xy, move_start, move_dur, in_motion,
+                  last_saccade_stop, saccade_interval, active, t_us, rand_pool,
+                  disp_size, sac_min, sac_max, micro_min, micro_max, gaze_max):
+    """Advance autonomous wandering for all eyes in one batched pass
+
+    State lives in parallel (SoA) arrays owned by EyeController; each eye
+    consumes up to 3 pre-drawn uniform floats from rand_pool. Compiled with
+    numba when available, otherwise runs as plain Python.
+    """
+    for i in range(eye_xy.shape[0]):
+        if not active[i]:
+            continue
+
+        dt = t_us - move_start[i]
+        r0 = rand_pool[i * 3]
+        r1 = rand_pool[i * 3 + 1]
+        r2 = rand_pool[i * 3 + 2]
+
+        if in_motion[i]:
+            if dt >= move_dur[i]:
+                # Movement complete
+                in_motion[i] = False
+                eye_xy[i, 0] = old_xy[i, 0] = new_xy[i, 0]
+                eye_xy[i, 1] = old_xy[i, 1] = new_xy[i, 1]
+
+                # Set hold duration
+                limit = min(1000000, gaze_max)
+                move_dur[i] = 35000 + int(r0 * (limit - 35000))
+
+                if saccade_interval[i] == 0:
+                    last_saccade_stop[i] = t_us
+                    saccade_interval[i] = move_dur[i] + int(r1 * (gaze_max - move_dur[i]))
+
+                move_start[i] = t_us
+            else:
+                # Interpolate position with smoothstep easing in Q16
+                # fixed point: integer multiplies and shifts stay on the
+                # CPython small-int fast path (no float boxing per op)
+                # and compile to plain ALU ops under numba
+                e_q16 = (dt << 16) // move_dur[i]
+                e2_q16 = (e_q16 * e_q16) >> 16
+                smooth_q16 = 3 * e2_q16 - ((2 * e2_q16 * e_q16) >> 16)
+                eye_xy[i, 0] = old_xy[i, 0] + (new_xy[i, 0] - old_xy[i, 0]) * smooth_q16 * (1.0 / 65536.0)
+                eye_xy[i, 1] = old_xy[i, 1] + (new_xy[i, 1] - old_xy[i, 1]) * smooth_q16 * (1.0 / 65536.0)
+        else:
+            # Eye stopped, check if time to move
+            eye_xy[i, 0] = old_xy[i, 0]
+            eye_xy[i, 1] = old_xy[i, 1]
+
+            if dt > move_dur[i]:
+                if (t_us - last_saccade_stop[i]) > saccade_interval[i]:
+                    # Time for a big saccade
+                    r = disp_size * 0.75
+                    nx = (r0 * 2.0 - 1.0) * r
+                    h = math.sqrt(r * r - nx * nx)
+                    new_xy[i, 0] = nx
+                    new_xy[i, 1] = (r1 * 2.0 - 1.0) * h
+                    move_dur[i] = sac_min + int(r2 * (sac_max - sac_min))
+                    saccade_interval[i] = 0
+                else:
+                    # Microsaccade
+                    r = disp_size * 0.07
+                    dx = (r0 * 2.0 - 1.0) * r
+                    h = math.sqrt(r * r - dx * dx)
+                    new_xy[i, 0] = eye_xy[i, 0] + dx
+                    new_xy[i, 1] = eye_xy[i, 1] + (r1 * 2.0 - 1.0) * h
+                    move_dur[i] = micro_min + int(r2 * (micro_max - micro_min))
+
+                move_start[i] = t_us
+                in_motion[i] = True
+
+
+def _build_eye_map(size, iris_radius):
+    """Build an oversized RGB565 map of a centered eye via a polar LUT
+
+    The map is 2x the display size so a gaze shift becomes a zero-copy
+    window slice at render time instead of per-frame geometry. Pupil,
+    iris and sclera are painted from the radius LUT once at init.
+    """
+    map_size = size * 2
+    center = map_size // 2
+    yy, xx = np.mgrid[0:map_size, 0:map_size]
+    r_lut = np.sqrt((xx - center) ** 2 + (yy - center) ** 2)
+
+    pupil_radius = iris_radius * 0.45
+    eye_map = np.full((map_size, map_size), SCLERA_COLOR, dtype='>u2')
+    eye_map[r_lut < iris_radius] = IRIS_COLOR
+    eye_map[r_lut < pupil_radius] = PUPIL_COLOR
+    return eye_map
+
+
 class Eye:
-    """Individual eye with animation state"""
-    
+    """Individual eye: display binding, blink state, and rendering
+
+    Gaze position is advanced in EyeController's batched SoA arrays and
+    mirrored into eye_x/eye_y before rendering.
+    """
+
     def __init__(self, name, display):
         self.name = name
         self.display = display
-        
-        # Position (-1.0 to 1.0 normalized coordinates)
+
+        # Rendering buffers: shared base map plus a per-eye framebuffer
+        # reused every frame (big-endian RGB565, ready for SPI)
+        self._eye_map = _build_eye_map(DISPLAY_SIZE, IRIS_RADIUS)
+        self._fb = np.empty((DISPLAY_SIZE, DISPLAY_SIZE), dtype='>u2')
+
+        # Position (display-pixel offsets from center) and blink factor,
+        # mirrored in from EyeController's SoA state before rendering
         self.eye_x = 0.0
         self.eye_y = 0.0
-        self.target_x = 0.0
-        self.target_y = 0.0
-        
-        # Movement state
-        self.in_motion = False
-        self.move_start_time = 0
-        self.move_duration = 0
-        self.old_x = 0.0
-        self.old_y = 0.0
-        self.new_x = 0.0
-        self.new_y = 0.0
-        
-        # Blink state
-        self.blink_state = EyeState.NOBLINK
-        self.blink_start_time = 0
-        self.blink_duration = 0
         self.blink_factor = 0.0
-        
+
         # Appearance
         self.pupil_factor = 0.5
         self.upper_lid_factor = 1.0
         self.lower_lid_factor = 1.0
-        
-        # Last saccade timing
-        self.last_saccade_stop = time.time() * 1000000
-        self.saccade_interval = 0
-        
-    def update_autonomous(self, current_time_us):
-        """Update eye with autonomous wandering behavior"""
-        dt = current_time_us - self.move_start_time
-        
-        if self.in_motion:
-            if dt >= self.move_duration:
-                # Movement complete
-                self.in_motion = False
-                self.eye_x = self.old_x = self.new_x
-                self.eye_y = self.old_y = self.new_y
-                
-                # Set hold duration
-                limit = min(1000000, GAZE_MAX)
-                self.move_duration = random.randint(35000, limit)
-                
-                if not self.saccade_interval:
-                    self.last_saccade_stop = current_time_us
-                    self.saccade_interval = random.randint(self.move_duration, GAZE_MAX)
-                
-                self.move_start_time = current_time_us
-            else:
-                # Interpolate position with easing
-                e = dt / self.move_duration
-                e = 3 * e * e - 2 * e * e * e  # Smooth easing function
-                self.eye_x = self.old_x + (self.new_x - self.old_x) * e
-                self.eye_y = self.old_y + (self.new_y - self.old_y) * e
-        else:
-            # Eye stopped, check if time to move
-            self.eye_x = self.old_x
-            self.eye_y = self.old_y
-            
-            if dt > self.move_duration:
-                if (current_time_us - self.last_saccade_stop) > self.saccade_interval:
-                    # Time for a big saccade
-                    r = DISPLAY_SIZE * 0.75
-                    self.new_x = random.uniform(-r, r)
-                    h = math.sqrt(r * r - self.new_x * self.new_x)
-                    self.new_y = random.uniform(-h, h)
-                    self.move_duration = random.randint(SACCADE_MIN_DURATION, SACCADE_MAX_DURATION)
-                    self.saccade_interval = 0
-                else:
-                    # Microsaccade
-                    r = DISPLAY_SIZE * 0.07
-                    dx = random.uniform(-r, r)
-                    self.new_x = self.eye_x + dx
-                    h = math.sqrt(r * r - dx * dx)
-                    self.new_y = self.eye_y + random.uniform(-h, h)
-                    self.move_duration = random.randint(MICROSACCADE_MIN_DURATION, MICROSACCADE_MAX_DURATION)
-                
-                self.move_start_time = current_time_us
-                self.in_motion = True
-    
-    def update_tracking(self, target_x, target_y):
-        """Update eye to track a target (-1.0 to 1.0 range)"""
-        r = DISPLAY_SIZE * 0.9
-        self.eye_x = target_x * r
-        self.eye_y = target_y * r
-    
-    def update_blink(self, current_time_us):
-        """Update blink animation"""
-        if self.blink_state != EyeState.NOBLINK:
-            dt = current_time_us - self.blink_start_time
-            
-            if dt >= self.blink_duration:
-                # State transition
-                if self.blink_state == EyeState.ENBLINK:
-                    # Switch to opening
-                    self.blink_state = EyeState.DEBLINK
-                    self.blink_duration *= 2  # Opening is slower
-                    self.blink_start_time = current_time_us
-                    self.blink_factor = 1.0
-                else:
-                    # Blink complete
-                    self.blink_state = EyeState.NOBLINK
-                    self.blink_factor = 0.0
-            else:
-                # Calculate blink progress
-                self.blink_factor = dt / self.blink_duration
-                if self.blink_state == EyeState.DEBLINK:
-                    self.blink_factor = 1.0 - self.blink_factor
-    
-    def start_blink(self, current_time_us, duration):
-        """Trigger a blink"""
-        if self.blink_state == EyeState.NOBLINK:
-            self.blink_state = EyeState.ENBLINK
-            self.blink_start_time = current_time_us
-            self.blink_duration = duration
-    
+
     def render(self):
-        """Render the eye to the display (simplified for now)"""
-        # This would be the complex polar mapping and texture code
-        # For now, just draw a simple representation
-        
-        # Calculate screen position
-        screen_x = int(DISPLAY_SIZE / 2 + self.eye_x)
-        screen_y = int(DISPLAY_SIZE / 2 + self.eye_y)
-        
-        # Clear display
-        self.display.fill_screen(SCLERA_COLOR)
-        
-        # Draw iris (simplified - just a filled region)
-        iris_radius = int(IRIS_RADIUS * (1.0 - self.blink_factor))
-        # This is where you'd draw the actual eye graphics
-        
-        # TODO: Implement full eye rendering with polar mapping
+        """Render the eye and push it to this eye's display"""
+        self.display.draw_buffer(self.render_frame())
+
+    def render_frame(self):
+        """Render the eye into the reusable framebuffer and return it
+
+        All per-frame work is numpy: slice a gaze-shifted window out of
+        the precomputed eye map, overlay the eyelids for the current
+        blink factor, and hand back the RGB565 buffer for SPI.
+        """
+        half = DISPLAY_SIZE // 2
+
+        # Gaze offset selects the window into the oversized map; positive
+        # eye_x looks right, so the window slides the opposite way
+        ox = int(max(-half, min(half, self.eye_x)))
+        oy = int(max(-half, min(half, self.eye_y)))
+        x0 = half + ox
+        y0 = half + oy
+        window = self._eye_map[y0:y0 + DISPLAY_SIZE, x0:x0 + DISPLAY_SIZE]
+
+        np.copyto(self._fb, window)
+
+        # Eyelids close symmetrically from top and bottom as the blink
+        # factor goes 0 -> 1
+        lid = int(self.blink_factor * half)
+        if lid > 0:
+            self._fb[:lid] = EYELID_COLOR
+            self._fb[DISPLAY_SIZE - lid:] = EYELID_COLOR
+
+        return self._fb
 
 
 class EyeController:
     """Controls all three eyes"""
-    
+
+    EYE_ORDER = ('left', 'right', 'middle')
+
     def __init__(self, display_manager):
         self.display_manager = display_manager
         self.mode = DEFAULT_MODE
-        
+
         # Create eye objects
         self.eyes = {
-            'left': Eye('left', display_manager.get_display('left')),
-            'right': Eye('right', display_manager.get_display('right')),
-            'middle': Eye('middle', display_manager.get_display('middle'))
+            name: Eye(name, display_manager.get_display(name))
+            for name in self.EYE_ORDER
         }
-        
+        self._eye_list = [self.eyes[name] for name in self.EYE_ORDER]
+        self._middle_idx = self.EYE_ORDER.index('middle')
+
+        # Per-eye movement state as parallel arrays so one batched kernel
+        # call advances all three eyes per frame
+        n = len(self.EYE_ORDER)
+        now_us = time.monotonic_ns() // 1000
+        self._eye_xy = np.zeros((n, 2), dtype=np.float64)
+        self._old_xy = np.zeros((n, 2), dtype=np.float64)
+        self._new_xy = np.zeros((n, 2), dtype=np.float64)
+        self._move_start = np.zeros(n, dtype=np.int64)
+        self._move_dur = np.zeros(n, dtype=np.int64)
+        self._in_motion = np.zeros(n, dtype=np.bool_)
+        self._last_saccade_stop = np.full(n, now_us, dtype=np.int64)
+        self._saccade_interval = np.zeros(n, dtype=np.int64)
+        self._active = np.ones(n, dtype=np.bool_)
+
+        # Batched randomness: draw 256 uniforms at a time and hand the
+        # kernel a slice per frame instead of touching the generator (or
+        # random.uniform) per transition
+        self._rng = np.random.default_rng()
+        self._rand_pool = self._rng.random(256)
+        self._rand_cursor = 0
+        self._rand_per_frame = 3 * n
+
+        # Blink state, vectorized alongside the movement arrays so all
+        # three eyes advance in a few numpy ops per frame
+        self._blink_state = np.zeros(n, dtype=np.int8)
+        self._blink_start = np.zeros(n, dtype=np.int64)
+        self._blink_dur = np.ones(n, dtype=np.int64)
+        self._blink_factor = np.zeros(n, dtype=np.float32)
+
+        # Warm up the jitted kernel so the first frame doesn't pay the
+        # compile cost
+        if NUMBA_AVAILABLE:
+            self._advance(now_us)
+
         # Blink timing
-        self.last_blink_time = time.time() * 1000000
+        self.last_blink_time = now_us
         self.next_blink_time = self.last_blink_time + random.randint(BLINK_INTERVAL_MIN, BLINK_INTERVAL_MIN * 2)
-        
+
         print(f"Eye controller initialized in {self.mode} mode")
-    
+
     def set_mode(self, mode):
         """Change eye behavior mode"""
         if mode in EYE_MODES.values():
@@ -184,45 +246,114 @@ class EyeController:
             print(f"Eye mode changed to: {mode}")
         else:
             print(f"Invalid mode: {mode}")
-    
+
+    def _next_rand(self):
+        """Slice the next frame's worth of uniforms from the pool"""
+        if self._rand_cursor + self._rand_per_frame > len(self._rand_pool):
+            self._rand_pool = self._rng.random(256)
+            self._rand_cursor = 0
+        chunk = self._rand_pool[self._rand_cursor:self._rand_cursor + self._rand_per_frame]
+        self._rand_cursor += self._rand_per_frame
+        return chunk
+
+    def _advance(self, current_time_us):
+        """Run the batched autonomous-movement kernel for active eyes"""
+        rand_pool = self._next_rand()
+        _advance_eyes(
+            self._eye_xy, self._old_xy, self._new_xy,
+            self._move_start, self._move_dur, self._in_motion,
+            self._last_saccade_stop, self._saccade_interval,
+            self._active, current_time_us, rand_pool,
+            float(DISPLAY_SIZE),
+            SACCADE_MIN_DURATION, SACCADE_MAX_DURATION,
+            MICROSACCADE_MIN_DURATION, MICROSACCADE_MAX_DURATION,
+            GAZE_MAX
+        )
+
+    def _update_blinks(self, current_time_us):
+        """Advance the blink animation for all eyes with vector ops"""
+        closing = self._blink_state == EyeState.ENBLINK
+        opening = self._blink_state == EyeState.DEBLINK
+        blinking = closing | opening
+        if not blinking.any():
+            return
+
+        dt = current_time_us - self._blink_start
+        finished = blinking & (dt >= self._blink_dur)
+
+        # Finished closing: hold shut and start the slower opening phase
+        m = finished & closing
+        self._blink_state[m] = EyeState.DEBLINK
+        self._blink_dur[m] *= 2
+        self._blink_start[m] = current_time_us
+        self._blink_factor[m] = 1.0
+
+        # Finished opening: blink complete
+        m = finished & opening
+        self._blink_state[m] = EyeState.NOBLINK
+        self._blink_factor[m] = 0.0
+
+        # Mid-blink: progress toward closed (ENBLINK) or open (DEBLINK)
+        running = blinking & ~finished
+        if running.any():
+            frac = dt / self._blink_dur
+            m = running & closing
+            self._blink_factor[m] = frac[m]
+            m = running & opening
+            self._blink_factor[m] = 1.0 - frac[m]
+
+    def _set_tracking(self, idx, target_x, target_y):
+        """Point an eye at a tracked target (-1.0 to 1.0 range)"""
+        r = DISPLAY_SIZE * 0.9
+        self._eye_xy[idx, 0] = target_x * r
+        self._eye_xy[idx, 1] = target_y * r
+        self._old_xy[idx] = self._eye_xy[idx]
+        self._in_motion[idx] = False
+
     def update(self, face_position=None):
         """Update all eyes based on current mode"""
-        current_time_us = int(time.time() * 1000000)
-        
-        # Handle blinks (all eyes)
+        # One monotonic clock read per frame, shared by blink and
+        # movement updates; immune to wall-clock jumps
+        current_time_us = time.monotonic_ns() // 1000
+
+        # Handle blinks (all eyes at once)
         if current_time_us >= self.next_blink_time:
             duration = random.randint(BLINK_MIN_DURATION, BLINK_MAX_DURATION)
-            for eye in self.eyes.values():
-                eye.start_blink(current_time_us, duration)
+            idle = self._blink_state == EyeState.NOBLINK
+            self._blink_state[idle] = EyeState.ENBLINK
+            self._blink_start[idle] = current_time_us
+            self._blink_dur[idle] = duration
             self.last_blink_time = current_time_us
             self.next_blink_time = current_time_us + duration * 3 + random.randint(BLINK_INTERVAL_MIN, BLINK_INTERVAL_MIN * 2)
-        
-        # Update blink animation
-        for eye in self.eyes.values():
-            eye.update_blink(current_time_us)
-        
+
+        self._update_blinks(current_time_us)
+
         # Update eye positions based on mode
         if self.mode == EYE_MODES['TRACKING']:
             # Middle eye tracks, left/right wander
+            self._active[:] = True
             if face_position:
-                self.eyes['middle'].update_tracking(face_position[0], face_position[1])
-            else:
-                self.eyes['middle'].update_autonomous(current_time_us)
-            
-            self.eyes['left'].update_autonomous(current_time_us)
-            self.eyes['right'].update_autonomous(current_time_us)
-            
+                self._active[self._middle_idx] = False
+                self._set_tracking(self._middle_idx, face_position[0], face_position[1])
+            self._advance(current_time_us)
+
         elif self.mode == EYE_MODES['WANDERING']:
             # All eyes wander
-            for eye in self.eyes.values():
-                eye.update_autonomous(current_time_us)
-                
+            self._active[:] = True
+            self._advance(current_time_us)
+
         elif self.mode == EYE_MODES['REST']:
             # Eyes closed or minimal movement
-            for eye in self.eyes.values():
-                eye.blink_factor = 1.0  # Keep closed
-    
+            self._blink_state[:] = EyeState.NOBLINK
+            self._blink_factor[:] = 1.0  # Keep closed
+
+        # Mirror batched state into the eye objects for rendering
+        for i, eye in enumerate(self._eye_list):
+            eye.eye_x = self._eye_xy[i, 0]
+            eye.eye_y = self._eye_xy[i, 1]
+            eye.blink_factor = float(self._blink_factor[i])
+
     def render_all(self):
-        """Render all eyes to their displays"""
-        for eye in self.eyes.values():
-            eye.render()
\ No newline at end of file
+        """Render all eyes and stream the frames in one batched pass"""
+        frames = {eye.name: eye.render_frame() for eye in self._eye_list}
+        self.display_manager.draw_all(frames)
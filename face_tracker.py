@@ -4,6 +4,7 @@ Face tracking using OpenCV and camera
 
 import cv2
 import numpy as np
+import os
 import time
 from picamera2 import Picamera2
 from config import *
@@ -15,8 +16,10 @@ class FaceTracker:
         # Initialize camera
         try:
             self.camera = Picamera2()
+            # YUV420: the first CAMERA_HEIGHT rows are the Y plane, so
+            # grayscale comes straight out of the ISP with no cvtColor
             config = self.camera.create_preview_configuration(
-                main={"size": (CAMERA_WIDTH, CAMERA_HEIGHT), "format": "RGB888"}
+                main={"size": (CAMERA_WIDTH, CAMERA_HEIGHT), "format": "YUV420"}
             )
             self.camera.configure(config)
             self.camera.start()
@@ -25,10 +28,28 @@ class FaceTracker:
             print(f"Error initializing camera: {e}")
             raise
         
-        # Load face detection cascade
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        self.face_cascade = cv2.CascadeClassifier(cascade_path)
-        
+        # Load face detection cascade. Prefer the LBP cascade: integer-only
+        # feature evaluation, ~2-3x faster than Haar on the Pi with
+        # comparable frontal-face accuracy. opencv-python only ships the
+        # Haar files, so fall back to Haar when LBP isn't installed
+        self.face_cascade = None
+        lbp_candidates = [
+            os.path.join(os.path.dirname(cv2.data.haarcascades.rstrip('/')),
+                         'lbpcascades', 'lbpcascade_frontalface_improved.xml'),
+            os.path.join(os.path.dirname(__file__), 'lbpcascade_frontalface_improved.xml'),
+        ]
+        for path in lbp_candidates:
+            if os.path.exists(path):
+                cascade = cv2.CascadeClassifier(path)
+                if not cascade.empty():
+                    self.face_cascade = cascade
+                    print(f"Using LBP cascade: {path}")
+                    break
+
+        if self.face_cascade is None:
+            cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            self.face_cascade = cv2.CascadeClassifier(cascade_path)
+
         if self.face_cascade.empty():
             raise RuntimeError("Failed to load face cascade classifier")
         
@@ -43,7 +64,30 @@ class FaceTracker:
         self.frame_count = 0
         self.fps_start_time = time.time()
         self.current_fps = 0
-        
+
+        # Detection runs on a downscaled frame; Haar cost is linear in
+        # pixel count so a 2x downscale cuts cascade work ~4x
+        self._detect_width = CAMERA_WIDTH // FACE_DETECT_DOWNSCALE
+        self._detect_height = CAMERA_HEIGHT // FACE_DETECT_DOWNSCALE
+        self._detect_min_size = max(1, FACE_MIN_SIZE // FACE_DETECT_DOWNSCALE)
+
+        # Prefer YuNet when its ONNX model is present: better recall
+        # under pose/lighting changes and cheaper than the cascade
+        # pyramid on Pi-class hardware. The cascade above stays loaded
+        # as the fallback
+        self._yunet = None
+        model_path = os.path.join(os.path.dirname(__file__), FACE_MODEL_PATH)
+        if hasattr(cv2, 'FaceDetectorYN') and os.path.exists(model_path):
+            try:
+                self._yunet = cv2.FaceDetectorYN.create(
+                    model_path, "",
+                    (self._detect_width, self._detect_height),
+                    score_threshold=0.7
+                )
+                print(f"Using YuNet face detector: {model_path}")
+            except cv2.error as e:
+                print(f"Could not load YuNet model, using cascade: {e}")
+
         # Give camera time to warm up
         time.sleep(2)
         print("Face tracker initialized and ready")
@@ -54,16 +98,29 @@ class FaceTracker:
             # Capture frame
             frame = self.camera.capture_array()
             
-            # Convert to grayscale for detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-            
-            # Detect faces
-            faces = self.face_cascade.detectMultiScale(
+            # Y plane of the YUV420 frame is already grayscale
+            gray = frame[:CAMERA_HEIGHT, :CAMERA_WIDTH]
+            small = cv2.resize(
                 gray,
-                scaleFactor=FACE_DETECTION_SCALE,
-                minNeighbors=FACE_MIN_NEIGHBORS,
-                minSize=(30, 30)
+                (self._detect_width, self._detect_height),
+                interpolation=cv2.INTER_AREA
             )
+
+            # Detect faces
+            if self._yunet is not None:
+                # YuNet wants a 3-channel frame; expanding the small gray
+                # image is much cheaper than converting at full resolution
+                bgr = cv2.cvtColor(small, cv2.COLOR_GRAY2BGR)
+                _, detections = self._yunet.detect(bgr)
+                faces = detections[:, :4].astype(np.int32) \
+                    if detections is not None else ()
+            else:
+                faces = self.face_cascade.detectMultiScale(
+                    small,
+                    scaleFactor=FACE_DETECTION_SCALE,
+                    minNeighbors=FACE_MIN_NEIGHBORS,
+                    minSize=(self._detect_min_size, self._detect_min_size)
+                )
             
             # Update FPS counter
             self.frame_count += 1
@@ -78,8 +135,8 @@ class FaceTracker:
             if len(faces) > 0:
                 # Get largest face (closest person)
                 largest_face = max(faces, key=lambda rect: rect[2] * rect[3])
-                x, y, w, h = largest_face
-                
+                x, y, w, h = (v * FACE_DETECT_DOWNSCALE for v in largest_face)
+
                 # Calculate center of face
                 face_center_x = x + w / 2
                 face_center_y = y + h / 2
@@ -3,11 +3,61 @@ LED controller for DotStar (SK9822) LED strip
 """
 
 import time
-import math
-import board
-import adafruit_dotstar
+import spidev
+import numpy as np
 from config import *
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels still run without numba"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+# Per-sector channel selection for HSV conversion: row i says which of
+# (v, t, p, q) becomes (r, g, b) in hue sector i. Two gathers replace
+# the classic six-way branch chain
+_HSV_PERM = np.array([
+    [0, 1, 2],
+    [3, 0, 2],
+    [2, 0, 1],
+    [2, 3, 0],
+    [1, 2, 0],
+    [0, 2, 3],
+], dtype=np.int8)
+
+
+@njit(cache=True)
+def _hsv_to_rgb(h, s, v):
+    """Convert HSV (0.0-1.0 each) to an (r, g, b) tuple of 0-255 ints"""
+    if s == 0.0:
+        value = int(v * 255)
+        return (value, value, value)
+
+    i = int(h * 6.0)
+    f = (h * 6.0) - i
+    i = i % 6
+
+    vals = np.empty(4)
+    vals[0] = v
+    vals[1] = v * (1.0 - s * (1.0 - f))  # t
+    vals[2] = v * (1.0 - s)              # p
+    vals[3] = v * (1.0 - s * f)          # q
+
+    perm = _HSV_PERM[i]
+    return (int(vals[perm[0]] * 255),
+            int(vals[perm[1]] * 255),
+            int(vals[perm[2]] * 255))
+
 class LEDPattern:
     """LED animation patterns"""
     SOLID = 'solid'
@@ -21,33 +71,98 @@ class LEDController:
     """Manages DotStar LED strip"""
     
     def __init__(self):
+        # All software state is built before the hardware is touched, so
+        # a failed SPI open still leaves a fully-formed controller:
+        # set_pattern/set_color keep working and update()'s strip guard
+        # turns the rest into no-ops
+        self.num_leds = DOTSTAR_NUM_LEDS
+        self.brightness = DOTSTAR_BRIGHTNESS
+        self.current_color = DEFAULT_LED_COLOR
+        self.current_pattern = DEFAULT_LED_PATTERN
+        self.pattern_speed = 1.0
+
+        # Animation state: a Q8 fixed-point tick counter (256 ticks
+        # per 60 Hz base frame) so patterns index with shifts and
+        # integer division instead of float-to-int casts
+        self._ticks = 0
+        self.last_update = time.time()
+
+        # Dirty flag for static patterns: solid (and a strobe phase
+        # that hasn't flipped) re-sends an identical frame over SPI
+        # every update otherwise. Anything that changes what's on the
+        # wire sets it
+        self._dirty = True
+        self._last_strobe_on = None
+
+        # Persistent (N, 3) RGB scratch buffer plus a 256-entry
+        # hue -> RGB LUT so rainbow frames are two numpy indexing
+        # ops instead of N Python-level _hsv_to_rgb calls
+        self._pixel_buf = np.zeros((self.num_leds, 3), dtype=np.uint8)
+        self._hue_lut = np.array(
+            [self._hsv_to_rgb(h / 256, 1.0, 1.0) for h in range(256)],
+            dtype=np.uint8
+        )
+        self._led_hue_idx = np.arange(self.num_leds) * 256 // self.num_leds
+        self._rng = np.random.default_rng()
+
+        # 256-entry sine table for the pulse pattern; indexed by an
+        # 8-bit phase so the hot path is a lookup plus integer
+        # multiply/shift per channel, no math.sin
+        self._sin_lut = (
+            (np.sin(np.linspace(0, 2 * np.pi, 256, endpoint=False)) + 1) * 127.5
+        ).astype(np.uint8)
+
+        # Chase fade weights depend only on the circular distance to
+        # the head, so the whole profile is one fixed table that gets
+        # rotated to the head position each frame
+        d = np.minimum(np.arange(self.num_leds),
+                       self.num_leds - np.arange(self.num_leds))
+        self._fade_lut = np.maximum(0, 255 - (d * 255 // 5)).astype(np.uint8)
+
+        # Pattern dispatch table; set_pattern rebinds the active
+        # function so update() makes one direct call instead of
+        # walking a string-compare chain
+        self._pattern_table = {
+            LEDPattern.SOLID: self._pattern_solid,
+            LEDPattern.PULSE: self._pattern_pulse,
+            LEDPattern.RAINBOW: self._pattern_rainbow,
+            LEDPattern.CHASE: self._pattern_chase,
+            LEDPattern.FIRE: self._pattern_fire,
+            LEDPattern.STROBE: self._pattern_strobe,
+        }
+        self._active_pattern_fn = self._pattern_table.get(
+            self.current_pattern, self._pattern_solid)
+
+        # Prebuilt SK9822 wire frame: 4-byte start frame of zeros,
+        # one (brightness, B, G, R) frame per LED, then enough
+        # trailing clock bytes to latch the strip. Only the color
+        # bytes change per frame; the header bytes carry the global
+        # brightness and are rewritten by set_brightness
+        n = self.num_leds
+        self._wire = bytearray(4 + 4 * n + (n // 16 + 1))
+        self._wire_np = np.frombuffer(self._wire, dtype=np.uint8)
+        self._write_brightness_headers()
+
         try:
-            # Initialize DotStar strip
-            # Note: DotStar uses hardware SPI, shares with displays
-            self.strip = adafruit_dotstar.DotStar(
-                board.SCK,  # Clock pin (GPIO 11)
-                board.MOSI,  # Data pin (GPIO 10)
-                DOTSTAR_NUM_LEDS,
-                brightness=DOTSTAR_BRIGHTNESS,
-                auto_write=False
-            )
-            
-            self.num_leds = DOTSTAR_NUM_LEDS
-            self.brightness = DOTSTAR_BRIGHTNESS
-            self.current_color = DEFAULT_LED_COLOR
-            self.current_pattern = DEFAULT_LED_PATTERN
-            self.pattern_speed = 1.0
-            
-            # Animation state
-            self.animation_frame = 0
-            self.last_update = time.time()
-            
+            # Drive the SK9822 wire protocol directly over spidev.
+            # Note: the strip shares the SPI bus with the displays; with
+            # hardware CS disabled on this handle the display CE lines
+            # stay idle during LED writes
+            self.strip = spidev.SpiDev()
+            self.strip.open(SPI_BUS, SPI_DEVICE)
+            self.strip.max_speed_hz = 8_000_000
+            self.strip.mode = 0
+            try:
+                self.strip.no_cs = True
+            except (IOError, OSError):
+                print("Warning: could not disable hardware CS for LED strip")
+
             # Clear strip on init
             self.clear()
-            self.strip.show()
-            
+            self._flush()
+
             print(f"LED controller initialized: {self.num_leds} LEDs")
-            
+
         except Exception as e:
             print(f"Error initializing LED controller: {e}")
             self.strip = None
@@ -59,11 +174,11 @@ class LEDController:
         Args:
             r, g, b: RGB values (0-255)
         """
-        self.current_color = (
-            max(0, min(255, int(r))),
-            max(0, min(255, int(g))),
-            max(0, min(255, int(b)))
-        )
+        # One vectorized clamp for all three channels instead of nine
+        # max/min/int calls
+        rgb = np.clip(np.array([r, g, b], dtype=np.int32), 0, 255)
+        self.current_color = tuple(rgb.tolist())
+        self._dirty = True
         
         if DEBUG_MODE:
             print(f"LED color set to RGB({r}, {g}, {b})")
@@ -77,7 +192,8 @@ class LEDController:
         """
         self.brightness = max(0.0, min(1.0, brightness))
         if self.strip:
-            self.strip.brightness = self.brightness
+            self._write_brightness_headers()
+        self._dirty = True
         
         if DEBUG_MODE:
             print(f"LED brightness set to {self.brightness * 100:.0f}%")
@@ -92,15 +208,24 @@ class LEDController:
         """
         self.current_pattern = pattern
         self.pattern_speed = speed
-        self.animation_frame = 0
+        self._ticks = 0
+        self._active_pattern_fn = self._pattern_table.get(pattern, self._pattern_solid)
+        self._dirty = True
         
         if DEBUG_MODE:
             print(f"LED pattern set to: {pattern} (speed: {speed}x)")
     
+    def _write_brightness_headers(self):
+        """Stamp the per-LED 0xE0|level header bytes into the wire frame"""
+        level = 0xE0 | int(self.brightness * 31)
+        end = 4 + 4 * self.num_leds
+        self._wire_np[4:end:4] = level
+
     def clear(self):
         """Turn off all LEDs"""
         if self.strip:
-            self.strip.fill((0, 0, 0))
+            self._pixel_buf[:] = 0
+            self._dirty = True
     
     def update(self):
         """Update LED animation - call this regularly in main loop"""
@@ -111,127 +236,112 @@ class LEDController:
         dt = current_time - self.last_update
         self.last_update = current_time
         
-        # Update animation frame based on speed
-        self.animation_frame += dt * self.pattern_speed * 60  # 60fps base rate
-        
-        # Execute current pattern
-        if self.current_pattern == LEDPattern.SOLID:
-            self._pattern_solid()
-        elif self.current_pattern == LEDPattern.PULSE:
-            self._pattern_pulse()
-        elif self.current_pattern == LEDPattern.RAINBOW:
-            self._pattern_rainbow()
-        elif self.current_pattern == LEDPattern.CHASE:
-            self._pattern_chase()
-        elif self.current_pattern == LEDPattern.FIRE:
-            self._pattern_fire()
-        elif self.current_pattern == LEDPattern.STROBE:
-            self._pattern_strobe()
+        # Advance the Q8 tick counter (60 Hz base rate * 256)
+        self._ticks += int(dt * self.pattern_speed * 15360)
         
+        # Execute current pattern (fills self._pixel_buf). A pattern
+        # returns False when the frame is identical to what's already on
+        # the strip, which skips the SPI write entirely
+        if self._active_pattern_fn() is False:
+            return
+
         # Update physical LEDs
-        self.strip.show()
+        self._flush()
+        self._dirty = False
+
+    def _flush(self):
+        """Send the pixel buffer to the strip in one SPI transaction
+
+        Three strided numpy assignments pack the (N, 3) RGB buffer into
+        the prebuilt BGR wire frame, then the whole frame goes out with
+        a single writebytes2 call - no per-pixel Python work at all.
+        """
+        end = 4 + 4 * self.num_leds
+        self._wire_np[5:end:4] = self._pixel_buf[:, 2]  # Blue
+        self._wire_np[6:end:4] = self._pixel_buf[:, 1]  # Green
+        self._wire_np[7:end:4] = self._pixel_buf[:, 0]  # Red
+        self.strip.writebytes2(self._wire)
     
     def _pattern_solid(self):
         """Solid color fill"""
-        self.strip.fill(self.current_color)
+        if not self._dirty:
+            return False
+        self._pixel_buf[:] = self.current_color
     
     def _pattern_pulse(self):
         """Breathing/pulsing effect"""
-        # Sine wave for smooth pulsing
-        pulse = (math.sin(self.animation_frame * 0.05) + 1) / 2  # 0.0 to 1.0
-        
+        # Same 0.05 rad/frame sine as before, quantized to the 256-entry
+        # LUT: 2.0372 table steps per frame = 522/65536 per Q8 tick
+        phase = (self._ticks * 522 >> 16) & 0xFF
+        scale = int(self._sin_lut[phase])
+
         r, g, b = self.current_color
         dimmed_color = (
-            int(r * pulse),
-            int(g * pulse),
-            int(b * pulse)
+            (r * scale) >> 8,
+            (g * scale) >> 8,
+            (b * scale) >> 8
         )
-        
-        self.strip.fill(dimmed_color)
+
+        self._pixel_buf[:] = dimmed_color
     
     def _pattern_rainbow(self):
         """Rainbow color cycle"""
-        for i in range(self.num_leds):
-            # Calculate hue based on position and animation frame
-            hue = (i / self.num_leds + self.animation_frame * 0.001) % 1.0
-            color = self._hsv_to_rgb(hue, 1.0, 1.0)
-            self.strip[i] = color
+        # Hue advances 0.001 cycles per frame = one LUT step per 1000
+        # Q8 ticks; rotate the per-LED base indices
+        offset = (self._ticks // 1000) & 0xFF
+        idx = (self._led_hue_idx + offset) & 0xFF
+        self._pixel_buf[:] = self._hue_lut[idx]
     
     def _pattern_chase(self):
         """Color chase effect"""
-        position = int(self.animation_frame * 0.2) % self.num_leds
-        
-        for i in range(self.num_leds):
-            if i == position:
-                self.strip[i] = self.current_color
-            else:
-                # Fade trail
-                distance = min(abs(i - position), self.num_leds - abs(i - position))
-                fade = max(0, 1.0 - distance / 5.0)
-                r, g, b = self.current_color
-                self.strip[i] = (int(r * fade), int(g * fade), int(b * fade))
+        # 0.2 LEDs per frame = one LED per 1280 Q8 ticks
+        position = (self._ticks // 1280) % self.num_leds
+        w = np.roll(self._fade_lut, position).astype(np.uint16)
+        r, g, b = self.current_color
+        self._pixel_buf[:, 0] = (r * w) >> 8
+        self._pixel_buf[:, 1] = (g * w) >> 8
+        self._pixel_buf[:, 2] = (b * w) >> 8
     
     def _pattern_fire(self):
         """Fire flicker effect"""
-        import random
-        
-        for i in range(self.num_leds):
-            # Random flicker
-            flicker = random.uniform(0.3, 1.0)
-            
-            # Fire colors (red/orange/yellow)
-            r = int(255 * flicker)
-            g = int(100 * flicker * random.uniform(0.3, 0.7))
-            b = 0
-            
-            self.strip[i] = (r, g, b)
+        # One batched draw covers both random factors for every LED,
+        # replacing 2N random.uniform calls per frame
+        rand = self._rng.random((self.num_leds, 2), dtype=np.float32)
+        flicker = 0.3 + 0.7 * rand[:, 0]
+        green_mul = 0.3 + 0.4 * rand[:, 1]
+
+        # Fire colors (red/orange/yellow)
+        self._pixel_buf[:, 0] = (255 * flicker).astype(np.uint8)
+        self._pixel_buf[:, 1] = (100 * flicker * green_mul).astype(np.uint8)
+        self._pixel_buf[:, 2] = 0
     
     def _pattern_strobe(self):
         """Strobe effect"""
-        # Fast on/off
-        if int(self.animation_frame * 0.5) % 2 == 0:
-            self.strip.fill(self.current_color)
+        # Fast on/off (flips every 2 frames); only flips reach the strip
+        on = (self._ticks >> 9) & 1 == 0
+        if on == self._last_strobe_on and not self._dirty:
+            return False
+        self._last_strobe_on = on
+
+        if on:
+            self._pixel_buf[:] = self.current_color
         else:
-            self.strip.fill((0, 0, 0))
+            self._pixel_buf[:] = 0
     
     def _hsv_to_rgb(self, h, s, v):
         """
         Convert HSV color to RGB
-        
+
         Args:
             h: Hue (0.0 to 1.0)
             s: Saturation (0.0 to 1.0)
             v: Value/brightness (0.0 to 1.0)
-            
+
         Returns:
             (r, g, b) tuple with values 0-255
         """
-        if s == 0.0:
-            r = g = b = int(v * 255)
-            return (r, g, b)
-        
-        i = int(h * 6.0)
-        f = (h * 6.0) - i
-        p = v * (1.0 - s)
-        q = v * (1.0 - s * f)
-        t = v * (1.0 - s * (1.0 - f))
-        i = i % 6
-        
-        if i == 0:
-            r, g, b = v, t, p
-        elif i == 1:
-            r, g, b = q, v, p
-        elif i == 2:
-            r, g, b = p, v, t
-        elif i == 3:
-            r, g, b = p, q, v
-        elif i == 4:
-            r, g, b = t, p, v
-        else:
-            r, g, b = v, p, q
-        
-        return (int(r * 255), int(g * 255), int(b * 255))
-    
+        return _hsv_to_rgb(h, s, v)
+
     def set_individual_led(self, index, r, g, b):
         """
         Set individual LED color
@@ -241,7 +351,8 @@ class LEDController:
             r, g, b: RGB values (0-255)
         """
         if self.strip and 0 <= index < self.num_leds:
-            self.strip[index] = (r, g, b)
+            self._pixel_buf[index] = (r, g, b)
+            self._dirty = True
     
     def fill_range(self, start, end, r, g, b):
         """
@@ -255,12 +366,15 @@ class LEDController:
         if not self.strip:
             return
         
-        for i in range(max(0, start), min(self.num_leds, end + 1)):
-            self.strip[i] = (r, g, b)
+        s = max(0, start)
+        e = min(self.num_leds, end + 1)
+        self._pixel_buf[s:e] = (r, g, b)
+        self._dirty = True
     
     def cleanup(self):
         """Turn off all LEDs and cleanup"""
         if self.strip:
             self.clear()
-            self.strip.show()
+            self._flush()
+            self.strip.close()
             print("LED controller stopped")
\ No newline at end of file
@@ -6,6 +6,7 @@ Integrates face tracking, eye animation, audio, and LEDs
 import time
 import signal
 import sys
+import threading
 from config import *
 from display_manager import DisplayManager
 from eye_controller import EyeController
@@ -26,16 +27,32 @@ class SkullController:
         self.audio_manager = None
         self.led_controller = None
         
-        # State management
+        # State management. All frame timing uses time.monotonic() -
+        # immune to NTP/wall-clock jumps, which matters for a prop that
+        # runs unattended all evening
         self.current_mode = DEFAULT_MODE
-        self.last_activity_time = time.time()
-        self.last_mode_check = time.time()
+        self.last_activity_time = time.monotonic()
+        self.last_mode_check = time.monotonic()
         self.face_was_detected = False
-        self.last_ambient_sound = time.time()
+        self.last_ambient_sound = time.monotonic()
+
+        # Hot-path config bound to instance attributes once; update()
+        # runs at ~100 Hz and instance lookups beat a global dict probe
+        # plus subscript every frame
+        self._rest_mode = EYE_MODES['REST']
+        self._show_fps = SHOW_FPS
+        self._debug = DEBUG_MODE
+
+        # Latest detection result published by the background detection
+        # thread as a single (position, timestamp) tuple. One writer, one
+        # reader, and reference assignment is atomic in CPython, so no
+        # lock is needed
+        self._latest_face = (None, 0.0)
+        self._detect_thread = None
         
         # Performance tracking
         self.frame_count = 0
-        self.fps_start_time = time.time()
+        self.fps_start_time = time.monotonic()
         
         # Setup signal handlers for clean shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -57,6 +74,13 @@ class SkullController:
             # Initialize face tracker
             print("Initializing face tracker...")
             self.face_tracker = FaceTracker()
+
+            # Haar detection costs 30-100 ms per frame on the Pi; running
+            # it on its own thread keeps the eye/LED loop at full rate
+            # while update() just reads the latest cached position
+            self._detect_thread = threading.Thread(
+                target=self._detect_worker, daemon=True)
+            self._detect_thread.start()
             
             # Initialize audio manager
             print("Initializing audio manager...")
@@ -80,6 +104,16 @@ class SkullController:
             self.cleanup()
             sys.exit(1)
     
+    def _detect_worker(self):
+        """Background loop that runs face detection continuously"""
+        while True:
+            try:
+                position = self.face_tracker.detect_faces()
+                self._latest_face = (position, time.monotonic())
+            except Exception as e:
+                print(f"Error in detection thread: {e}")
+                time.sleep(0.5)
+
     def run_test_sequence(self):
         """Run a quick test of all systems"""
         print("Running system tests...")
@@ -110,10 +144,8 @@ class SkullController:
         self.cleanup()
         sys.exit(0)
     
-    def check_inactivity(self):
+    def check_inactivity(self, current_time):
         """Check for inactivity timeout and switch to rest mode"""
-        current_time = time.time()
-        
         # Only check periodically to save CPU
         if current_time - self.last_mode_check < LAST_ACTIVITY_CHECK_INTERVAL:
             return
@@ -125,13 +157,13 @@ class SkullController:
         
         # Switch to rest mode if inactive too long
         if inactive_time > INACTIVITY_TIMEOUT:
-            if self.current_mode != EYE_MODES['REST']:
+            if self.current_mode != self._rest_mode:
                 print(f"No activity for {INACTIVITY_TIMEOUT}s, entering rest mode")
                 self.set_mode(EYE_MODES['REST'])
                 self.led_controller.set_brightness(0.2)  # Dim LEDs
         else:
             # If in rest mode but activity detected, wake up
-            if self.current_mode == EYE_MODES['REST'] and self.face_tracker.is_face_detected():
+            if self.current_mode == self._rest_mode and self.face_tracker.is_face_detected():
                 print("Activity detected, waking up")
                 self.set_mode(DEFAULT_MODE)
                 self.led_controller.set_brightness(DOTSTAR_BRIGHTNESS)
@@ -146,21 +178,24 @@ class SkullController:
     
     def update(self):
         """Main update loop - called every frame"""
-        
-        # Get face position from tracker
+        # One clock read serves the whole frame
+        now = time.monotonic()
+
+        # Read the latest face position published by the detection
+        # thread; no camera or detector work happens on this thread
         face_position = None
-        if self.current_mode != EYE_MODES['REST']:
-            face_position = self.face_tracker.detect_faces()
+        if self.current_mode != self._rest_mode:
+            face_position, _detect_time = self._latest_face
         
         # Handle face detection state changes
         face_detected = self.face_tracker.is_face_detected()
         
         if face_detected:
-            self.last_activity_time = time.time()
+            self.last_activity_time = now
             
             # Face just detected
             if not self.face_was_detected:
-                if DEBUG_MODE:
+                if self._debug:
                     print("Face detected!")
                 self.audio_manager.play_detection_sound()
                 self.led_controller.set_pattern(LEDPattern.PULSE, speed=1.5)
@@ -169,7 +204,7 @@ class SkullController:
         else:
             # Face lost
             if self.face_was_detected:
-                if DEBUG_MODE:
+                if self._debug:
                     print("Face lost")
                 self.led_controller.set_pattern(DEFAULT_LED_PATTERN, speed=1.0)
             
@@ -183,36 +218,46 @@ class SkullController:
         self.led_controller.update()
         
         # Play random ambient sounds occasionally
-        current_time = time.time()
-        if current_time - self.last_ambient_sound > 30:  # Every 30 seconds
+        if now - self.last_ambient_sound > 30:  # Every 30 seconds
             if not self.audio_manager.is_currently_playing():
                 self.audio_manager.play_random_ambient()
-                self.last_ambient_sound = current_time
+                self.last_ambient_sound = now
         
         # Check for inactivity
-        self.check_inactivity()
+        self.check_inactivity(now)
         
         # Update FPS counter
         self.frame_count += 1
-        elapsed = time.time() - self.fps_start_time
-        if elapsed > 5.0 and SHOW_FPS:  # Report every 5 seconds
+        elapsed = now - self.fps_start_time
+        if elapsed > 5.0 and self._show_fps:  # Report every 5 seconds
             fps = self.frame_count / elapsed
             print(f"Main loop FPS: {fps:.1f}")
             self.frame_count = 0
-            self.fps_start_time = time.time()
+            self.fps_start_time = now
     
     def run(self):
         """Main program loop"""
         print("Starting main loop...\n")
         
+        # Fixed-tick pacing: each frame sleeps only for the remainder of
+        # its period, so a 2 ms frame doesn't burn a full 10 ms sleep and
+        # a slow frame doesn't push every later tick out
+        target_dt = 1 / 60
+        next_tick = time.monotonic()
+
         try:
             while True:
                 self.update()
-                
-                # Small delay to prevent CPU overload
-                # Adjust this based on performance
-                time.sleep(0.01)  # ~100 FPS max
-                
+
+                next_tick += target_dt
+                sleep_for = next_tick - time.monotonic()
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
+                elif sleep_for < -target_dt:
+                    # Fell more than a full period behind; resynchronize
+                    # instead of fast-forwarding through missed ticks
+                    next_tick = time.monotonic()
+
         except KeyboardInterrupt:
             print("\nKeyboard interrupt received")
         except Exception as e:
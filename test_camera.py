@@ -3,8 +3,14 @@ Simple camera and face detection test
 """
 
 import cv2
+import numpy as np
+import os
 import time
-from picamera2 import Picamera2
+from picamera2 import MappedArray, Picamera2
+
+# YuNet ONNX model; detection falls back to the Haar cascade when the
+# file isn't present next to this script
+YUNET_MODEL = 'face_detection_yunet_2023mar.onnx'
 
 def test_camera_basic():
     """Test basic camera functionality"""
@@ -41,10 +47,12 @@ def test_face_detection():
     print("Press 'q' to quit\n")
     
     try:
-        # Initialize camera
+        # Initialize camera. YUV420 means the Y plane is already the
+        # grayscale image the detector wants - no per-frame RGB to gray
+        # conversion
         camera = Picamera2()
         config = camera.create_preview_configuration(
-            main={"size": (640, 480), "format": "RGB888"}
+            main={"size": (640, 480), "format": "YUV420"}
         )
         camera.configure(config)
         camera.start()
@@ -57,6 +65,15 @@ def test_face_detection():
         if face_cascade.empty():
             print("ERROR: Could not load face cascade classifier")
             return False
+
+        # Prefer YuNet when the model file is available - faster and
+        # more robust than the cascade at prop range
+        yunet = None
+        model_path = os.path.join(os.path.dirname(__file__), YUNET_MODEL)
+        if hasattr(cv2, 'FaceDetectorYN') and os.path.exists(model_path):
+            yunet = cv2.FaceDetectorYN.create(
+                model_path, "", (320, 240), score_threshold=0.7)
+            print(f"Using YuNet face detector: {model_path}")
         
         print("Face detection ready!")
         print("Stand in front of camera...\n")
@@ -64,25 +81,67 @@ def test_face_detection():
         frame_count = 0
         face_count = 0
         start_time = time.time()
+        use_opencl = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+
+        # Preallocated per-frame buffers; dst= keeps resize/cvtColor from
+        # allocating a fresh ndarray 30 times a second
+        small_buf = np.empty((240, 320), np.uint8)
+        frame_buf = np.empty((480, 640, 3), np.uint8)
         
         while True:
-            # Capture frame
-            frame = camera.capture_array()
-            frame_count += 1
-            
-            # Convert to grayscale for detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
-            
-            # Detect faces
-            faces = face_cascade.detectMultiScale(
-                gray,
-                scaleFactor=1.1,
-                minNeighbors=5,
-                minSize=(30, 30)
-            )
-            
-            # Draw rectangles around faces
+            # Borrow the frame straight out of the camera pipeline:
+            # MappedArray mmaps the request's buffer in place (unlike
+            # make_array/capture_array, which copy). All work on the
+            # view stays inside the mapping, and the finally guarantees
+            # the buffer goes back to the camera even if OpenCV throws
+            request = camera.capture_request()
+            try:
+                with MappedArray(request, 'main') as mapped:
+                    yuv = mapped.array
+                    frame_count += 1
+
+                    # The Y plane is the top height-rows block of the
+                    # YUV420 layout - a zero-copy grayscale view
+                    gray = yuv[:480, :640]
+
+                    # Detect on a half-size frame: detectMultiScale cost
+                    # scales with pixel count, so this is ~4x less
+                    # detector work. minSize shrinks with the image to
+                    # keep the same real-world face size threshold
+                    small = cv2.resize(gray, (320, 240), dst=small_buf,
+                                       interpolation=cv2.INTER_AREA)
+
+                    if yunet is not None:
+                        # YuNet wants 3 channels; expand the small frame
+                        _, detections = yunet.detect(
+                            cv2.cvtColor(small, cv2.COLOR_GRAY2BGR))
+                        faces = detections[:, :4].astype(int) \
+                            if detections is not None else ()
+                    else:
+                        # With OpenCL on, a UMat input lets the
+                        # cascade's pyramid and integral-image stages
+                        # run via the T-API
+                        if use_opencl:
+                            small = cv2.UMat(small)
+                        faces = face_cascade.detectMultiScale(
+                            small,
+                            scaleFactor=1.1,
+                            minNeighbors=5,
+                            minSize=(15, 15)
+                        )
+
+                    # Color conversion happens only for the preview
+                    # window, outside the detection path. It copies out
+                    # of the mapped buffer, so everything after the
+                    # release works on our own memory
+                    frame = cv2.cvtColor(yuv, cv2.COLOR_YUV420p2BGR,
+                                         dst=frame_buf)
+            finally:
+                request.release()
+
+            # Draw rectangles around faces (scaled back to full size)
             for (x, y, w, h) in faces:
+                x, y, w, h = x * 2, y * 2, w * 2, h * 2
                 cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
                 
                 # Calculate normalized position
@@ -148,6 +207,16 @@ def main():
     print("CAMERA & FACE DETECTION TEST")
     print("="*50)
     print()
+
+    # Enable OpenCV's NEON/threaded code paths on the Pi
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(4)
+
+    # Route eligible ops through OpenCL when a device is present;
+    # OpenCV falls back to the CPU silently otherwise
+    if cv2.ocl.haveOpenCL():
+        cv2.ocl.setUseOpenCL(True)
+        print("OpenCL enabled for OpenCV")
     
     # Test 1: Basic camera
     if not test_camera_basic():
@@ -3,8 +3,14 @@ Simple camera test using OpenCV VideoCapture (no picamera2)
 """
 
 import cv2
+import numpy as np
+import os
 import time
 
+# YuNet ONNX model; detection falls back to the Haar cascade when the
+# file isn't present next to this script
+YUNET_MODEL = 'face_detection_yunet_2023mar.onnx'
+
 def test_camera_opencv():
     """Test camera using OpenCV's VideoCapture"""
     print("Testing camera with OpenCV VideoCapture...")
@@ -30,6 +36,14 @@ def test_camera_opencv():
         if face_cascade.empty():
             print("ERROR: Could not load face cascade")
             return False
+
+        # Prefer YuNet when the model file is available
+        yunet = None
+        model_path = os.path.join(os.path.dirname(__file__), YUNET_MODEL)
+        if hasattr(cv2, 'FaceDetectorYN') and os.path.exists(model_path):
+            yunet = cv2.FaceDetectorYN.create(
+                model_path, "", (320, 240), score_threshold=0.7)
+            print(f"Using YuNet face detector: {model_path}")
         
         print("Starting face detection (30 seconds)...\n")
         
@@ -37,6 +51,12 @@ def test_camera_opencv():
         face_count = 0
         start_time = time.time()
         test_duration = 30
+        use_opencl = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+
+        # Preallocated per-frame buffers so cvtColor/resize reuse the
+        # same memory instead of allocating each iteration
+        gray_buf = np.empty((480, 640), np.uint8)
+        small_buf = np.empty((240, 320), np.uint8)
         
         while time.time() - start_time < test_duration:
             ret, frame = cap.read()
@@ -48,17 +68,31 @@ def test_camera_opencv():
             frame_count += 1
             
             # Convert to grayscale
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Detect faces
-            faces = face_cascade.detectMultiScale(
-                gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30)
-            )
-            
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray_buf)
+
+            # Detect on a half-size frame (~4x less detector work);
+            # minSize shrinks to match, rects scale back up below
+            small = cv2.resize(gray, (320, 240), dst=small_buf,
+                               interpolation=cv2.INTER_AREA)
+
+            if yunet is not None:
+                # YuNet wants 3 channels; expand the small gray frame
+                _, detections = yunet.detect(
+                    cv2.cvtColor(small, cv2.COLOR_GRAY2BGR))
+                faces = detections[:, :4].astype(int) \
+                    if detections is not None else ()
+            else:
+                # T-API path when OpenCL is live (CPU fallback otherwise)
+                if use_opencl:
+                    small = cv2.UMat(small)
+                faces = face_cascade.detectMultiScale(
+                    small, scaleFactor=1.1, minNeighbors=5, minSize=(15, 15)
+                )
+
             if len(faces) > 0:
                 face_count += 1
                 largest = max(faces, key=lambda r: r[2]*r[3])
-                x, y, w, h = largest
+                x, y, w, h = (v * 2 for v in largest)
                 
                 # Calculate normalized position
                 center_x = x + w/2
@@ -112,4 +146,15 @@ if __name__ == "__main__":
     print("OPENCV CAMERA TEST")
     print("="*50)
     print()
+
+    # Enable OpenCV's NEON/threaded code paths on the Pi
+    cv2.setUseOptimized(True)
+    cv2.setNumThreads(4)
+
+    # Route eligible ops through OpenCL when a device is present;
+    # OpenCV falls back to the CPU silently otherwise
+    if cv2.ocl.haveOpenCL():
+        cv2.ocl.setUseOpenCL(True)
+        print("OpenCL enabled for OpenCV")
+
     test_camera_opencv()
\ No newline at end of file
@@ -3,150 +3,463 @@ Face tracking using OpenCV VideoCapture (no picamera2)
 """
 
 import cv2
+import numpy as np
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from config import *
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in so the kernels still run without numba"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+        return decorator
+
+
+@njit(cache=True, nogil=True)
+def _normalize(x, y, w, h, cx, cy, inv_cx, inv_cy, inv_qa):
+    """Face box -> (normalized center x, center y, confidence)
+
+    Takes the frame-geometry constants precomputed at init (half
+    extents, their reciprocals, reciprocal quarter area) so the hot
+    path multiplies instead of dividing.
+    """
+    nx = (x + w * 0.5 - cx) * inv_cx
+    ny = (y + h * 0.5 - cy) * inv_cy
+    # Branch-style clamps compile to compare-selects under the jit
+    if nx < -1.0:
+        nx = -1.0
+    elif nx > 1.0:
+        nx = 1.0
+    if ny < -1.0:
+        ny = -1.0
+    elif ny > 1.0:
+        ny = 1.0
+    conf = (w * h) * inv_qa
+    if conf > 1.0:
+        conf = 1.0
+    return nx, ny, conf
+
 class FaceTracker:
     """Handles camera and face detection using OpenCV"""
-    
+
     def __init__(self):
+        # Enable OpenCV's optimized dispatch and pin its worker pool;
+        # an unbounded pool oversubscribes the Pi against the capture
+        # thread and burns time in context switches
+        cv2.setUseOptimized(True)
+        cv2.setNumThreads(OPENCV_NUM_THREADS)
+
+        # T-API: with an OpenCL device the cascade's integral-image and
+        # pyramid kernels run on the GPU when handed a UMat; without one
+        # the flag stays off and frames go in as plain ndarrays
+        if cv2.ocl.haveOpenCL():
+            cv2.ocl.setUseOpenCL(True)
+        self._use_opencl = cv2.ocl.haveOpenCL() and cv2.ocl.useOpenCL()
+
         # Initialize camera with OpenCV
         try:
             self.camera = cv2.VideoCapture(0)
-            
+
             if not self.camera.isOpened():
                 raise RuntimeError("Could not open camera")
-            
+
             # Set resolution
             self.camera.set(cv2.CAP_PROP_FRAME_WIDTH, CAMERA_WIDTH)
             self.camera.set(cv2.CAP_PROP_FRAME_HEIGHT, CAMERA_HEIGHT)
             self.camera.set(cv2.CAP_PROP_FPS, CAMERA_FPS)
-            
-            print("Camera initialized successfully")
+
+            # Single-frame capture queue: when detection lags, read()
+            # returns the newest frame instead of a stale backlog
+            self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+            # Ask V4L2 for luma directly so no full-frame BGR-to-gray
+            # pass runs per capture. GREY is the Y plane as-is; if the
+            # driver rejects it, YUYV interleaves Y with chroma and a
+            # stride view recovers it; otherwise stay on BGR + cvtColor
+            self._capture_format = 'BGR'
+            if self.camera.set(cv2.CAP_PROP_CONVERT_RGB, 0):
+                if self.camera.set(cv2.CAP_PROP_FOURCC,
+                                   cv2.VideoWriter_fourcc(*'GREY')):
+                    self._capture_format = 'GREY'
+                elif self.camera.set(cv2.CAP_PROP_FOURCC,
+                                     cv2.VideoWriter_fourcc(*'YUYV')):
+                    self._capture_format = 'YUYV'
+                else:
+                    self.camera.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+
+            print(f"Camera initialized successfully ({self._capture_format})")
         except Exception as e:
             print(f"Error initializing camera: {e}")
             raise
-        
-        # Load face detection cascade
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        self.face_cascade = cv2.CascadeClassifier(cascade_path)
-        
+
+        # Load face detection cascade. Prefer the LBP cascade, same as
+        # the picamera2 tracker: integer-only feature evaluation, ~2-3x
+        # faster than Haar with comparable frontal-face accuracy.
+        # opencv-python only ships the Haar files, so fall back when LBP
+        # isn't installed
+        self.face_cascade = None
+        cascade_path = None
+        lbp_candidates = [
+            os.path.join(os.path.dirname(cv2.data.haarcascades.rstrip('/')),
+                         'lbpcascades', 'lbpcascade_frontalface_improved.xml'),
+            os.path.join(os.path.dirname(__file__),
+                         'lbpcascade_frontalface_improved.xml'),
+        ]
+        for path in lbp_candidates:
+            if os.path.exists(path):
+                cascade = cv2.CascadeClassifier(path)
+                if not cascade.empty():
+                    self.face_cascade = cascade
+                    cascade_path = path
+                    print(f"Using LBP cascade: {path}")
+                    break
+
+        if self.face_cascade is None:
+            cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+            self.face_cascade = cv2.CascadeClassifier(cascade_path)
+
         if self.face_cascade.empty():
             raise RuntimeError("Failed to load face cascade classifier")
-        
+
+        # Optional dual-scale detection: a near pass (large minSize) and
+        # a far pass (small faces only) run concurrently - OpenCV drops
+        # the GIL inside detectMultiScale, so two Python threads really
+        # do overlap. detectMultiScale isn't re-entrant, hence the
+        # second classifier instance
+        self._pool = None
+        self._far_cascade = None
+        if FACE_DUAL_SCALE_DETECT:
+            self._pool = ThreadPoolExecutor(max_workers=2)
+            self._far_cascade = cv2.CascadeClassifier(cascade_path)
+
         # State
         self.last_face_position = None
         self.face_detected = False
         self.last_detection_time = 0
         self.frames_without_face = 0
         self.detection_confidence = 0
-        
-        # Performance tracking
+
+        # Performance tracking (monotonic clock: vDSO-fast and immune
+        # to wall-clock jumps)
         self.frame_count = 0
-        self.fps_start_time = time.time()
+        self.fps_start_time = time.monotonic()
         self.current_fps = 0
-        
-        # Warm up camera
-        for _ in range(10):
-            self.camera.read()
-        
+
+        # Detection runs on a downscaled frame (cascade cost is linear
+        # in pixels, so 2x down is ~4x less work); the resize writes
+        # into a preallocated buffer instead of a fresh ndarray per frame
+        self._detect_width = CAMERA_WIDTH // FACE_DETECT_DOWNSCALE
+        self._detect_height = CAMERA_HEIGHT // FACE_DETECT_DOWNSCALE
+        self._detect_min_size = max(1, FACE_MIN_SIZE // FACE_DETECT_DOWNSCALE)
+        self._small_gray = np.empty(
+            (self._detect_height, self._detect_width), np.uint8)
+        self._gray = np.empty((CAMERA_HEIGHT, CAMERA_WIDTH), np.uint8)
+
+        # Motion gate: a frame that barely differs from the previous one
+        # can't move the face, so the cascade is skipped entirely. The
+        # gate probes every 4th pixel on both axes (1/16 the work, and
+        # the probe fits in L1); threshold is 0.5% of probed pixels
+        # changing by more than 20 levels
+        self._prev_probe = None
+        probe_shape = (CAMERA_HEIGHT // 4, CAMERA_WIDTH // 4)
+        self._diff = np.empty(probe_shape, np.int16)
+        self._motion_min_pixels = int(probe_shape[0] * probe_shape[1] * 0.005)
+
+        # Full detection runs every few frames; a KCF tracker follows
+        # the face in between at a fraction of the cascade cost. The
+        # factory lives wherever this OpenCV build put it (contrib
+        # trackers moved to cv2.legacy in 4.5), or stays None so every
+        # frame detects
+        if hasattr(cv2, 'TrackerKCF_create'):
+            self._make_tracker = cv2.TrackerKCF_create
+        elif hasattr(cv2, 'legacy') and hasattr(cv2.legacy, 'TrackerKCF_create'):
+            self._make_tracker = cv2.legacy.TrackerKCF_create
+        else:
+            self._make_tracker = None
+        self._tracker = None
+        self._tick = 0
+
+        # Last winning box in detection-frame coords; while it's fresh,
+        # full detection searches only a window around it
+        self._last_bbox = None
+
+        # Frame-geometry constants for the normalization kernel, folded
+        # once instead of recomputed per frame
+        self._cx = CAMERA_WIDTH * 0.5
+        self._cy = CAMERA_HEIGHT * 0.5
+        self._inv_cx = 1.0 / self._cx
+        self._inv_cy = 1.0 / self._cy
+        self._inv_qa = 1.0 / (CAMERA_WIDTH * CAMERA_HEIGHT * 0.25)
+
+        # Warm the normalization kernel so the first detection doesn't
+        # pay the compile
+        if NUMBA_AVAILABLE:
+            _normalize(0, 0, 1, 1, self._cx, self._cy,
+                       self._inv_cx, self._inv_cy, self._inv_qa)
+
+        # Prefer YuNet when its ONNX model is present, same as the
+        # picamera2 tracker; the cascade stays loaded as the fallback
+        self._yunet = None
+        model_path = os.path.join(os.path.dirname(__file__), FACE_MODEL_PATH)
+        if hasattr(cv2, 'FaceDetectorYN') and os.path.exists(model_path):
+            try:
+                self._yunet = cv2.FaceDetectorYN.create(
+                    model_path, "",
+                    (self._detect_width, self._detect_height),
+                    score_threshold=0.7
+                )
+                print(f"Using YuNet face detector: {model_path}")
+            except cv2.error as e:
+                print(f"Could not load YuNet model, using cascade: {e}")
+
+        # Capture runs on its own thread into a single latest-frame
+        # slot, so a blocking read() (up to a full frame period)
+        # overlaps with detection instead of serializing with it
+        self._frame_lock = threading.Lock()
+        self._latest = None
+        self._stop = False
+        self._reader = threading.Thread(target=self._reader_loop, daemon=True)
+        self._reader.start()
+
         print("Face tracker initialized and ready")
-    
+
+    def _reader_loop(self):
+        """Continuously read frames into the latest-frame slot
+
+        The camera read is the one realistic failure point, so the
+        exception handler lives here rather than wrapping the whole
+        detection body - detect_faces() runs without per-call handler
+        setup on the hot path.
+        """
+        while not self._stop:
+            try:
+                ret, frame = self.camera.read()
+            except cv2.error as e:
+                print(f"Camera read error: {e}")
+                time.sleep(0.1)
+                continue
+            if not ret:
+                time.sleep(0.01)
+                continue
+            with self._frame_lock:
+                self._latest = frame
+
     def detect_faces(self):
         """Capture frame and detect faces, return normalized position"""
-        try:
-            # Capture frame
-            ret, frame = self.camera.read()
-            
-            if not ret:
-                print("Warning: Failed to capture frame")
-                return None
-            
-            # Convert to grayscale for detection
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            # Detect faces
+        # Take the freshest frame from the reader thread; each frame
+        # is consumed at most once
+        with self._frame_lock:
+            frame = self._latest
+            self._latest = None
+
+        if frame is None:
+            # No new frame yet; keep reporting the current state
+            return self.last_face_position if self.face_detected else None
+
+        # One clock read serves FPS accounting and detection stamps
+        now = time.monotonic()
+
+        # Grayscale extraction depends on the negotiated format;
+        # the YUYV path is a zero-copy stride view over the Y bytes
+        if self._capture_format == 'GREY':
+            gray = frame.reshape(CAMERA_HEIGHT, CAMERA_WIDTH)
+        elif self._capture_format == 'YUYV':
+            gray = frame.reshape(CAMERA_HEIGHT, CAMERA_WIDTH, 2)[:, :, 0]
+        else:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY,
+                                dst=self._gray)
+
+        # Short-circuit static scenes before any detection work;
+        # the decimated probe is a zero-copy strided view
+        probe = gray[::4, ::4]
+        if self._prev_probe is None:
+            self._prev_probe = probe.copy()
+        else:
+            np.subtract(probe, self._prev_probe, dtype=np.int16,
+                        out=self._diff, casting='unsafe')
+            np.abs(self._diff, out=self._diff)
+            moving = int((self._diff > 20).sum())
+            np.copyto(self._prev_probe, probe)
+            if moving < self._motion_min_pixels:
+                return self.last_face_position if self.face_detected \
+                    else None
+
+        small = cv2.resize(
+            gray,
+            (self._detect_width, self._detect_height),
+            dst=self._small_gray,
+            interpolation=cv2.INTER_AREA
+        )
+
+        # Try the tracker on the off-frames; a lost track falls
+        # straight through to full detection
+        self._tick += 1
+        tracked = False
+        if self._tracker is not None and self._tick % 5 != 0:
+            ok, bbox = self._tracker.update(small)
+            if ok:
+                faces = (tuple(int(v) for v in bbox),)
+                tracked = True
+            else:
+                self._tracker = None
+
+        # While the last hit is fresh, search only a window of about
+        # twice the face size around it - cascade cost tracks the
+        # slice area, so this is a 5-10x smaller search
+        x_off = y_off = 0
+        roi = small
+        if not tracked and self._last_bbox is not None \
+                and self.frames_without_face < 5:
+            bx, by, bw, bh = self._last_bbox
+            cx = bx + bw // 2
+            cy = by + bh // 2
+            x_off = max(0, cx - bw * 2)
+            y_off = max(0, cy - bh * 2)
+            roi = small[y_off:cy + bh * 2, x_off:cx + bw * 2]
+
+        # Detect faces
+        if tracked:
+            pass
+        elif self._yunet is not None:
+            # YuNet wants a 3-channel frame; expanding at detection
+            # size is cheaper than handing it the full-size capture
+            bgr = cv2.cvtColor(roi, cv2.COLOR_GRAY2BGR)
+            self._yunet.setInputSize((bgr.shape[1], bgr.shape[0]))
+            _, detections = self._yunet.detect(bgr)
+            faces = detections[:, :4].astype(np.int32) \
+                if detections is not None else ()
+        elif self._pool is not None:
+            # Near pass looks for big (close) faces, far pass sweeps
+            # the small scales; merged results feed the same
+            # largest-area selection below
+            near = self._pool.submit(
+                self.face_cascade.detectMultiScale, roi,
+                scaleFactor=FACE_DETECTION_SCALE,
+                minNeighbors=FACE_MIN_NEIGHBORS,
+                minSize=(self._detect_min_size * 2,) * 2
+            )
+            far = self._pool.submit(
+                self._far_cascade.detectMultiScale, roi,
+                scaleFactor=FACE_DETECTION_SCALE,
+                minNeighbors=FACE_MIN_NEIGHBORS,
+                minSize=(self._detect_min_size,) * 2,
+                maxSize=(self._detect_min_size * 2,) * 2
+            )
+            hits = [f for f in (near.result(), far.result()) if len(f)]
+            faces = np.vstack(hits) if hits else ()
+        else:
+            if self._use_opencl:
+                roi = cv2.UMat(roi)
             faces = self.face_cascade.detectMultiScale(
-                gray,
+                roi,
                 scaleFactor=FACE_DETECTION_SCALE,
                 minNeighbors=FACE_MIN_NEIGHBORS,
-                minSize=(30, 30)
+                minSize=(self._detect_min_size, self._detect_min_size)
             )
-            
-            # Update FPS counter
-            self.frame_count += 1
-            elapsed = time.time() - self.fps_start_time
+
+        # Map ROI-relative boxes back to detection-frame coords
+        if not tracked and len(faces) > 0 and (x_off or y_off):
+            faces = np.asarray(faces).copy()
+            faces[:, 0] += x_off
+            faces[:, 1] += y_off
+
+        # Update FPS counter; the division/print branch is only
+        # considered every 32 frames
+        self.frame_count += 1
+        if self.frame_count & 31 == 0:
+            elapsed = now - self.fps_start_time
             if elapsed > 1.0:
                 self.current_fps = self.frame_count / elapsed
                 self.frame_count = 0
-                self.fps_start_time = time.time()
+                self.fps_start_time = now
                 if DEBUG_MODE and SHOW_FPS:
                     print(f"Face detection FPS: {self.current_fps:.1f}")
-            
-            if len(faces) > 0:
-                # Get largest face (closest person)
-                largest_face = max(faces, key=lambda rect: rect[2] * rect[3])
-                x, y, w, h = largest_face
-                
-                # Calculate center of face
-                face_center_x = x + w / 2
-                face_center_y = y + h / 2
-                
-                # Normalize to -1.0 to 1.0 range
-                normalized_x = (face_center_x - CAMERA_WIDTH / 2) / (CAMERA_WIDTH / 2)
-                normalized_y = (face_center_y - CAMERA_HEIGHT / 2) / (CAMERA_HEIGHT / 2)
-                
-                # Clamp values
-                normalized_x = max(-1.0, min(1.0, normalized_x))
-                normalized_y = max(-1.0, min(1.0, normalized_y))
-                
-                # Calculate confidence
-                face_area = w * h
-                max_area = CAMERA_WIDTH * CAMERA_HEIGHT
-                self.detection_confidence = min(1.0, face_area / (max_area * 0.25))
-                
-                # Update state
-                self.last_face_position = (normalized_x, normalized_y)
-                self.face_detected = True
-                self.last_detection_time = time.time()
-                self.frames_without_face = 0
-                
-                if DEBUG_MODE:
-                    print(f"Face at: ({normalized_x:.2f}, {normalized_y:.2f}), conf: {self.detection_confidence:.2f}")
-                
+
+        if len(faces) > 0:
+            # Get largest face (closest person): one vectorized
+            # area multiply + argmax instead of a Python max(key=...)
+            faces = np.asarray(faces)
+            areas = faces[:, 2].astype(np.int32) * faces[:, 3]
+            largest_face = faces[int(areas.argmax())]
+            self._last_bbox = tuple(int(v) for v in largest_face)
+
+            # Seed the tracker from a fresh detection
+            if not tracked and self._make_tracker is not None:
+                self._tracker = self._make_tracker()
+                self._tracker.init(
+                    small, tuple(int(v) for v in largest_face))
+
+            x, y, w, h = (v * FACE_DETECT_DOWNSCALE for v in largest_face)
+
+            # Center/normalize/confidence math lives in one jitted
+            # scalar kernel
+            normalized_x, normalized_y, confidence = _normalize(
+                x, y, w, h, self._cx, self._cy,
+                self._inv_cx, self._inv_cy, self._inv_qa)
+            self.detection_confidence = confidence
+
+            # Update state
+            self.last_face_position = (normalized_x, normalized_y)
+            self.face_detected = True
+            self.last_detection_time = now
+            self.frames_without_face = 0
+
+            if DEBUG_MODE:
+                print(f"Face at: ({normalized_x:.2f}, {normalized_y:.2f}), conf: {self.detection_confidence:.2f}")
+
+            return self.last_face_position
+        else:
+            # No face detected; drop any stale tracker so the next
+            # frame runs a full detection (the ROI ages out on its
+            # own via frames_without_face)
+            self._tracker = None
+            self.frames_without_face += 1
+
+            # Keep last position briefly
+            if self.frames_without_face < 30:
                 return self.last_face_position
             else:
-                # No face detected
-                self.frames_without_face += 1
-                
-                # Keep last position briefly
-                if self.frames_without_face < 30:
-                    return self.last_face_position
-                else:
-                    self.face_detected = False
-                    self.detection_confidence = 0
-                    return None
-                    
-        except Exception as e:
-            print(f"Error during face detection: {e}")
-            return None
-    
+                self.face_detected = False
+                self.detection_confidence = 0
+                return None
+
     def get_face_position(self):
         return self.last_face_position if self.face_detected else None
-    
+
     def is_face_detected(self):
         return self.face_detected
-    
+
     def get_detection_confidence(self):
         return self.detection_confidence
-    
+
     def get_time_since_detection(self):
+        """Seconds since the last face detection"""
+        # detect_faces already reads the monotonic clock every call, so
+        # the stamp costs nothing extra here - and frame-count deltas
+        # drift whenever the motion gate skips frames the FPS counter
+        # never sees
         if self.last_detection_time == 0:
             return float('inf')
-        return time.time() - self.last_detection_time
-    
+        return time.monotonic() - self.last_detection_time
+
     def cleanup(self):
         """Stop camera"""
+        self._stop = True
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        if self._reader is not None:
+            self._reader.join(timeout=2.0)
         if self.camera:
             self.camera.release()
             print("Face tracker stopped")
\ No newline at end of file